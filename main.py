@@ -22,13 +22,14 @@ examples: dict[str, Any] = {
 
 
 async def main(o: OutropyApi, example: str) -> None:
-    if example == 'all':
-        console.log(f"Running [b]all[/b] examples: [b]{[k for k in examples.keys()]}[/b]")
-        for example_to_run in examples:
-            await run_example(example_to_run, o)
-        return
-    else:
-        await run_example(example, o)
+    async with o:
+        if example == 'all':
+            console.log(f"Running [b]all[/b] examples: [b]{[k for k in examples.keys()]}[/b]")
+            for example_to_run in examples:
+                await run_example(example_to_run, o)
+            return
+        else:
+            await run_example(example, o)
 
 
 async def run_example(example: str, o: OutropyApi) -> None:
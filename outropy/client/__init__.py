@@ -1 +1,10 @@
+import os
+from pathlib import Path
+
 OUTROPY_API_KEY = "OUTROPY_API_KEY"
+OUTROPY_STATE_DIR = "OUTROPY_STATE_DIR"
+
+
+def outropy_state_dir() -> Path:
+    """Where the client keeps local state such as upload manifests and caches."""
+    return Path(os.getenv(OUTROPY_STATE_DIR, Path.home() / ".outropy"))
@@ -1,32 +1,63 @@
 import asyncio
-import io
+import hashlib
+import importlib.util
 import json
 import os
+import pickle
+import tempfile
+import uuid
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import aclosing, asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, BinaryIO, Dict, List, Optional, Type, TypeVar, Union, cast
+from typing import (
+    IO,
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import httpx
 from httpx import Response
+from jiter import from_json
 from pydantic import BaseModel
 
 from outropy.client import OUTROPY_API_KEY
 from outropy.client.api_headers import (
+    IDEMPOTENCY_KEY_HEADER,
     UPLOAD_FILE_MIME_TYPE_HEADER,
     UPLOAD_FILE_SIZE_HEADER,
+    UPLOAD_PART_OFFSET_HEADER,
 )
 from outropy.client.benchmark import (
     BenchmarkExecuteRequest,
     BenchmarkRunResponse,
     CreateBenchmarkRequest,
 )
+from outropy.client.codec import decode, is_null
 from outropy.client.data_source import (
     DataSourceMetadata,
     DataSourceResponse,
     IndexCreateResponse,
 )
 from outropy.client.directives import Directives
+from outropy.client.multipart import DEFAULT_CHUNK_SIZE, MultipartBody, UploadSource
+from outropy.client.exceptions import OutropyHttpError
+from outropy.client.lanes import Lane, LaneConfig
+from outropy.client.memo import ExecutionKey, MemoPolicy
 from outropy.client.pipeline import TaskExecuteResponse, TaskRunResponse
+from outropy.client.polling import PollingPolicy, RunDurationHistory
 from outropy.client.requests import (
     CreateDataSourceRequest,
     CreateIndexRequest,
@@ -36,31 +67,140 @@ from outropy.client.requests import (
     IndexerType,
     OutropyUrn,
     TaskNames,
+    UploadedPart,
 )
-from outropy.types.pydantic_to_schema import (
-    recursive_convert_pydantic_to_dict,
-    to_schema,
+from outropy.copypasta.cache.content_cache import ContentCache
+from outropy.copypasta.cache.persistent_store import PersistentStore
+from outropy.copypasta.concurrent.bounded import ItemResult, bounded_map
+from outropy.copypasta.concurrent.single_flight import SingleFlight
+from outropy.copypasta.json.array_stream import ArrayItemReader
+from outropy.copypasta.json.json import dumpb
+from outropy.copypasta.resilience.balancer import Endpoint, EndpointBalancer
+from outropy.copypasta.resilience.rate_limit import RateLimit, RouteLimiter
+from outropy.copypasta.resilience.retry import (
+    Backoff,
+    RetryBudget,
+    RetryEngine,
+    RetryPolicy,
 )
+from outropy.types.pydantic_to_schema import cached_schema
 
 OutT = TypeVar("OutT", bound=BaseModel)
 InT = TypeVar("InT", bound=BaseModel)
+T = TypeVar("T")
 
 ReturnType = Type[OutT] | Type[str] | List[Type[OutT]] | List[Type[str]]
 
 
+DEFAULT_TIMEOUT = 60 * 10
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_SPILL_THRESHOLD = 32 * 1024 * 1024
+DEFAULT_OFFLOAD_THRESHOLD = 1024 * 1024
+DEFAULT_BATCH_BYTES = 8 * 1024 * 1024
+DEFAULT_BATCH_FILES = 100
+# Metadata requests checking whether earlier uploads still exist, across all uploads
+DEFAULT_PROBE_CONCURRENCY = 16
+
+# Sidecar deployments can serve the API on a Unix domain socket, e.g.
+# unix:///run/outropy/api.sock. Requests still need an HTTP URL, whose host only ends
+# up in the Host header
+UNIX_SOCKET_SCHEME = "unix://"
+UNIX_SOCKET_BASE_URL = "http://localhost/"
+
+# Runs are only known to the endpoint that created them
+RUN_CREATING_ROUTES = ("/pipelines/execute", "/benchmarks/execute")
+RUN_ROUTES = ("/pipelines/runs/", "/benchmarks/runs/")
+
+UPLOADS_NAMESPACE = "uploads"
+UPLOAD_DIGESTS_NAMESPACE = "upload-digests"
+TASKS_NAMESPACE = "tasks"
+TASK_FINGERPRINTS_NAMESPACE = "task-fingerprints"
+EXECUTIONS_NAMESPACE = "executions"
+RESULTS_NAMESPACE = "results"
+DATA_NAMESPACE = "data"
+# Gone, or not ours to see any more, either way it has to be sent again
+MISSING_DATA_STATUSES = (403, 404, 410)
+
+
+def default_retry_policy() -> RetryPolicy:
+    transient = Backoff(max_attempts=4, base_delay=0.2, max_delay=10)
+    return RetryPolicy(
+        status_backoffs={
+            429: Backoff(max_attempts=6, base_delay=1, max_delay=30),
+            502: transient,
+            503: transient,
+            504: transient,
+        },
+        exception_backoffs={
+            httpx.ConnectError: transient,
+            httpx.ConnectTimeout: transient,
+            httpx.PoolTimeout: transient,
+            httpx.ReadError: transient,
+            httpx.RemoteProtocolError: transient,
+        },
+        unsent_exceptions=(httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout),
+    )
+
+
+def _picklable(value: Any) -> bool:
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
 class OutropyApi:
 
     def __init__(
-        self, api_key: Optional[str] = None, api_endpoint: Optional[str] = None
+        self,
+        api_key: Optional[str] = None,
+        api_endpoint: Optional[str | List[str]] = None,
+        *,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = DEFAULT_TIMEOUT,
+        http2: bool = False,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        polling_policy: Optional[PollingPolicy] = None,
+        rate_limits: Optional[Dict[str, RateLimit]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        upload_chunk_size: int = DEFAULT_CHUNK_SIZE,
+        spill_threshold: int = DEFAULT_SPILL_THRESHOLD,
+        trusted_responses: bool = False,
+        decode_executor: Optional[Executor] = None,
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        coalesce_reads: bool = True,
+        content_cache: Optional[ContentCache] = None,
+        state_store: Optional[PersistentStore] = None,
+        memo_policy: Optional[MemoPolicy] = None,
+        control_lane: Optional[LaneConfig] = None,
     ) -> None:
 
-        self.base_url = (
+        endpoints = (
             api_endpoint
-            or os.getenv("OUTROPY_API_ENDPOINT", None)
-            or "http://localhost:8000/"
+            if isinstance(api_endpoint, list)
+            else [
+                api_endpoint
+                or os.getenv("OUTROPY_API_ENDPOINT", None)
+                or "http://localhost:8000/"
+            ]
         )
-        if not self.base_url.endswith("/"):
-            self.base_url += "/"
+        self.uds_path: Optional[str] = None
+        if any(e.startswith(UNIX_SOCKET_SCHEME) for e in endpoints):
+            if len(endpoints) > 1:
+                raise ValueError(
+                    "A Unix socket endpoint can't be combined with other endpoints"
+                )
+            self.uds_path = endpoints[0][len(UNIX_SOCKET_SCHEME) :]  # noqa: E203
+            endpoints = [UNIX_SOCKET_BASE_URL]
+        endpoints = [e if e.endswith("/") else f"{e}/" for e in endpoints]
+        # URLs are built against the first endpoint, and moved to whichever endpoint
+        # the balancer picks when they are sent
+        self.base_url = endpoints[0]
+        self.balancer = EndpointBalancer(endpoints)
 
         if api_key is None:
             api_key = os.getenv(OUTROPY_API_KEY, None)
@@ -70,92 +210,477 @@ class OutropyApi:
                 )
         self.api_key = api_key
 
-    async def upload_file(self, mime_type: str, file_path: str | Path) -> OutropyUrn:
-        # Get the file size
-        path = Path(file_path) if isinstance(file_path, str) else file_path
-        file_size = path.lstat().st_size
+        # One pooled client per lane for the lifetime of this object, so each
+        # connection only pays the TCP/TLS handshake once. Bulk transfers get their own
+        # pool, so a long upload or download never holds up submits and polls. The
+        # connection limits above are shared by both lanes: submits and polls get up
+        # to half of them with the short LaneConfig timeouts, or whatever control_lane
+        # asks for, and the bulk lane gets the rest and `timeout`. Calls that can take
+        # minutes to answer, like creating tasks and indexes, use the bulk lane too
+        if control_lane is None:
+            defaults = LaneConfig()
+            control_lane = LaneConfig(
+                max_connections=min(
+                    defaults.max_connections, max(1, max_connections // 2)
+                ),
+                max_keepalive_connections=min(
+                    defaults.max_keepalive_connections, max_keepalive_connections // 2
+                ),
+                keepalive_expiry=keepalive_expiry,
+            )
+        bulk_lane = LaneConfig(
+            max_connections=max(1, max_connections - control_lane.max_connections),
+            max_keepalive_connections=max(
+                0, max_keepalive_connections - control_lane.max_keepalive_connections
+            ),
+            keepalive_expiry=keepalive_expiry,
+            connect_timeout=min(timeout, DEFAULT_CONNECT_TIMEOUT),
+            read_timeout=timeout,
+            write_timeout=timeout,
+            pool_timeout=timeout,
+        )
+        self.lanes = {Lane.CONTROL: control_lane, Lane.BULK: bulk_lane}
+        # What both lanes together can open
+        self.limits = httpx.Limits(
+            max_connections=sum(lane.max_connections for lane in self.lanes.values()),
+            max_keepalive_connections=sum(
+                lane.max_keepalive_connections for lane in self.lanes.values()
+            ),
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self._transport = transport
+        self._clients: Dict[Lane, httpx.AsyncClient] = {}
+
+        # HTTP/2 multiplexes concurrent requests over a few connections, but
+        # needs the optional h2 package
+        if http2 and importlib.util.find_spec("h2") is None:
+            raise ImportError(
+                "HTTP/2 mode requires the 'h2' package, install it with `pip install httpx[http2]`"
+            )
+        self.http2 = http2
+        self.http_versions: Counter[str] = Counter()
+        self.negotiated_http_version: Optional[str] = None
+
+        self.polling_policy = polling_policy or PollingPolicy()
+        self.run_durations = RunDurationHistory()
+
+        # Keyed by route family under /api, e.g. {"/pipelines/*": RateLimit(...)}
+        self.rate_limiter = RouteLimiter(rate_limits)
+
+        # GETs are always retried on transient failures, POSTs only when they carry an
+        # idempotency key
+        self.retry_engine = RetryEngine(
+            retry_policy or default_retry_policy(), retry_budget or RetryBudget()
+        )
+
+        self.upload_chunk_size = upload_chunk_size
+        # Downloads bigger than this are kept in a temporary file instead of in memory
+        self.spill_threshold = spill_threshold
+        # Skip validating typed responses, for servers whose output we already trust
+        self.trusted_responses = trusted_responses
+        # With a `decode_executor`, responses bigger than this are decoded in it, so
+        # the event loop keeps serving other requests. Decoding holds the GIL
+        # throughout, so only a process pool really helps; types it can't pickle, e.g.
+        # ones defined in a function, are still decoded inline
+        self.decode_executor = decode_executor
+        self.offload_threshold = offload_threshold
 
-        # Open the file in binary mode
-        with path.open("rb") as file_stream:
-            file_name = path.name
+        # Concurrent identical GETs, e.g. many waiters polling the same run, share one
+        # request. Decoded results are shared as is, so treat them as read-only
+        self.coalesce_reads = coalesce_reads
+        self._reads: SingleFlight[Tuple[str, str, bytes], Response] = SingleFlight()
+        self._decoded_reads: SingleFlight[Tuple[Any, ...], Any] = SingleFlight()
 
-            return await self._upload(file_name, mime_type, file_size, file_stream)
+        # Downloaded data by URN, in memory only unless given a cache with a disk_dir.
+        # ContentCache(memory_bytes=0) turns caching off
+        self.content_cache = content_cache or ContentCache()
+
+        # Local state that outlives the process, e.g.
+        # PersistentStore(outropy_state_dir() / "state.db"). With it, uploading the
+        # same content again returns the earlier URN, and creating an unchanged task
+        # returns the existing one without calling the server
+        self.state_store = state_store
+        self._upload_probes = asyncio.Semaphore(DEFAULT_PROBE_CONCURRENCY)
+
+        # Reproducible executions (see MemoPolicy) of the same task, subjects,
+        # directives and reference data reuse the earlier run and its results. The
+        # results of those runs are kept in the state store under the same policy
+        if memo_policy is not None and state_store is None:
+            raise ValueError("Memoizing executions requires a state_store")
+        self.memo_policy = memo_policy
+        self._memoized_runs: Set[str] = set()
+        self._memoized_results: Set[str] = set()
+        # Bytes memoized per namespace since it was last trimmed
+        self._memo_unevicted: Counter[str] = Counter()
+
+    async def __aenter__(self) -> "OutropyApi":
+        self._http_client()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def _http_client(self, lane: Lane = Lane.CONTROL) -> httpx.AsyncClient:
+        client = self._clients.get(lane)
+        if client is None or client.is_closed:
+            config = self.lanes[lane]
+            transport = self._transport
+            if transport is None and self.uds_path is not None:
+                # A custom transport owns the pool, so the lane limits go to it
+                transport = httpx.AsyncHTTPTransport(
+                    uds=self.uds_path, limits=config.limits(), http2=self.http2
+                )
+            client = httpx.AsyncClient(
+                timeout=config.timeout(),
+                limits=config.limits(),
+                transport=transport,
+                http2=self.http2,
+                follow_redirects=True,
+                event_hooks={"response": [self._record_http_version]},
+            )
+            self._clients[lane] = client
+        return client
+
+    async def _record_http_version(self, response: Response) -> None:
+        self.negotiated_http_version = response.http_version
+        self.http_versions[response.http_version] += 1
+
+    def _scoped_key(self, key: str) -> str:
+        # What exists on one server or account doesn't exist on the others
+        scope = f"{self.base_url}\0{self.api_key}\0{key}"
+        return hashlib.sha256(scope.encode()).hexdigest()
+
+    def _auth_headers(self) -> Dict[str, str]:
+        if self.api_key.startswith("ot-"):
+            return {"Authorization": f"Bearer {self.api_key}"}
+        return {OUTROPY_API_KEY: self.api_key}
+
+    async def upload_file(self, mime_type: str, file_path: str | Path) -> OutropyUrn:
+        path = Path(file_path) if isinstance(file_path, str) else file_path
+        return await self._upload(mime_type, UploadSource.from_path(path))
 
     async def upload_object(
         self, *, name: Optional[str] = None, obj: InT
     ) -> OutropyUrn:
         n = name or f"{obj.__class__.__name__}-{datetime.now().isoformat()}"
-        return await self.upload_json(n, obj.model_dump())
+        source = UploadSource.from_bytes(n, dumpb(obj))
+        return await self._upload("application/json", source)
 
     async def upload_text(self, name: str, mime_type: str, text: str) -> OutropyUrn:
-        # Get the file size
-        file_size = len(text)
-
-        # Open the file in binary mode
-        file_stream = io.BytesIO(text.encode())
-
-        return await self._upload(name, mime_type, file_size, file_stream)
+        source = UploadSource.from_bytes(name, text.encode())
+        return await self._upload(mime_type, source)
 
     async def upload_json(self, name: str, json_object: Dict[str, Any]) -> OutropyUrn:
-        return await self.upload_text(name, "application/json", json.dumps(json_object))
+        source = UploadSource.from_bytes(name, dumpb(json_object))
+        return await self._upload("application/json", source)
 
     async def download_object(
         self, expected_type: Type[OutT], results_id: OutropyUrn
     ) -> Optional[OutT]:
-        as_json = await self.download_json(results_id)
-        if as_json is None:
+        content = await self._download(results_id)
+        if is_null(content):
             return None
-        return expected_type(**as_json)
+        return await self._decode(expected_type, content)
 
     async def download_json(self, data_urn: str) -> Optional[Dict[Any, Any]]:
-        as_text = await self.download_text(data_urn)
+        content = await self._download(data_urn)
+        # Parse the raw bytes, decoding them to a str first is one more full copy
         try:
-            return json.loads(as_text)  # type: ignore
+            return json.loads(content)  # type: ignore
         except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse JSON: {as_text}") from e
+            raise Exception(f"Failed to parse JSON: {content.decode()}") from e
 
     async def download_text(self, data_urn: str) -> str:
+        return (await self._download(data_urn)).decode()
+
+    async def _download(self, data_urn: str) -> bytes:
+        # Data URNs are immutable, so whatever we fetched once is good forever
+        cached = await self.content_cache.aget(data_urn)
+        if cached is not None:
+            return cached
+        # Results of memoized runs are also kept in the state store, so the next
+        # process reusing the run doesn't have to download them again
+        memo_key = (
+            self._scoped_key(data_urn) if data_urn in self._memoized_results else None
+        )
+        if memo_key is not None and self.state_store is not None:
+            memoized = await self.state_store.aget(DATA_NAMESPACE, memo_key)
+            if memoized is not None:
+                await self.content_cache.aput(data_urn, memoized)
+                return memoized
+
         path = f"/data/{data_urn}"
-        response = await self._make_http_request(f"{self.base_url}api{path}", "GET", {})
-        return response.text
+        response = await self._make_http_request(
+            self._build_full_url(path), "GET", {}, lane=Lane.BULK
+        )
+        await self.content_cache.aput(data_urn, response.content)
+        if memo_key is not None:
+            await self._memoize(DATA_NAMESPACE, memo_key, response.content)
+        return response.content
 
-    async def _upload(
-        self, file_name: str, mime_type: str, file_size: int, file_stream: BinaryIO
-    ) -> str:
+    async def download_stream(
+        self, data_urn: str, chunk_size: Optional[int] = None
+    ) -> AsyncGenerator[bytes, None]:
+        url = self._build_full_url(f"/data/{data_urn}")
+        async with self._stream_http_request(url) as response:
+            async for chunk in response.aiter_bytes(chunk_size):
+                yield chunk
+
+    async def download_array_items(
+        self,
+        data_urn: str,
+        item_type: Optional[Type[T]] = None,
+        *,
+        field: Optional[str] = None,
+    ) -> AsyncIterator[T]:
+        """Yields the elements of a JSON array in a result while it downloads.
+
+        The array is the whole result, or the value of `field` in it, e.g.
+        `codeSuggestions`. Elements are decoded as `item_type` when given.
+        """
+        reader = ArrayItemReader(field)
+        # Returning early has to close the stream too, or its connection is only given
+        # back to the pool once the generator is garbage collected
+        async with aclosing(self.download_stream(data_urn)) as chunks:
+            async for chunk in chunks:
+                for element in reader.feed(chunk):
+                    if item_type is None:
+                        yield from_json(element)
+                    else:
+                        yield await self._decode(item_type, element)
+                if reader.finished:
+                    return
+        reader.close()
+
+    async def download_to_file(self, data_urn: str, file_path: str | Path) -> Path:
+        path = Path(file_path)
+        partial_path = path.with_name(f"{path.name}.partial")
+        try:
+            with partial_path.open("wb") as f:
+                async for chunk in self.download_stream(data_urn):
+                    f.write(chunk)
+            os.replace(partial_path, path)
+        finally:
+            partial_path.unlink(missing_ok=True)
+        return path
+
+    async def download_spooled(
+        self, data_urn: str, spill_threshold: Optional[int] = None
+    ) -> IO[bytes]:
+        """Downloads into memory, moving to a temporary file once past the threshold.
+
+        The returned file is positioned at the start, and is deleted when closed.
+        """
+        spooled = tempfile.SpooledTemporaryFile(
+            max_size=spill_threshold or self.spill_threshold
+        )
+        try:
+            async for chunk in self.download_stream(data_urn):
+                spooled.write(chunk)
+        except BaseException:
+            spooled.close()
+            raise
+        spooled.seek(0)
+        return spooled
+
+    async def upload_many(
+        self,
+        uploads: Iterable[Tuple[str, UploadSource]],
+        *,
+        max_batch_bytes: int = DEFAULT_BATCH_BYTES,
+        max_batch_files: int = DEFAULT_BATCH_FILES,
+        concurrency: int = 4,
+    ) -> List[OutropyUrn]:
+        """Uploads many payloads, packed into as few multipart requests as possible.
+
+        Each upload is a `(mime_type, UploadSource)` pair, and the URNs come back in
+        the same order. Payloads of the same mime type share requests of up to
+        `max_batch_bytes` and `max_batch_files`, with at most `concurrency` requests
+        in flight. The first failed request fails the whole call.
+        """
+        items = list(uploads)
+        by_mime_type: Dict[str, List[int]] = {}
+        for index, (mime_type, _) in enumerate(items):
+            by_mime_type.setdefault(mime_type, []).append(index)
+
+        batches: List[Tuple[str, List[int]]] = []
+        for mime_type, indexes in by_mime_type.items():
+            batch: List[int] = []
+            batch_bytes = 0
+            for index in indexes:
+                size = items[index][1].size
+                if batch and (
+                    batch_bytes + size > max_batch_bytes
+                    or len(batch) >= max_batch_files
+                ):
+                    batches.append((mime_type, batch))
+                    batch, batch_bytes = [], 0
+                batch.append(index)
+                batch_bytes += size
+            batches.append((mime_type, batch))
+
+        async def upload(batch: Tuple[str, List[int]]) -> List[str]:
+            mime_type, indexes = batch
+            return await self._upload_batch(mime_type, [items[i][1] for i in indexes])
+
+        urns: List[OutropyUrn] = [""] * len(items)
+        async with aclosing(bounded_map(upload, batches, concurrency)) as results:
+            async for result in results:
+                (_, indexes), batch_urns = result.item, result.unwrap()
+                for index, urn in zip(indexes, batch_urns):
+                    urns[index] = urn
+        return urns
+
+    async def _upload(self, mime_type: str, source: UploadSource) -> str:
+        (urn,) = await self._upload_batch(mime_type, [source])
+        return urn
+
+    async def _upload_batch(
+        self, mime_type: str, sources: List[UploadSource]
+    ) -> List[str]:
+        if self.state_store is None:
+            return await self._send_upload(mime_type, sources)
+        store = self.state_store
+
+        # Same bytes and mime type means the same data, whatever the file is called
+        prefix = f"{mime_type}\0".encode()
+        keys = [await asyncio.to_thread(s.digest, prefix) for s in sources]
+
+        async def previous_upload(key: str) -> Optional[str]:
+            previous = store.get(UPLOADS_NAMESPACE, self._scoped_key(key))
+            if previous is None:
+                return None
+            async with self._upload_probes:
+                if await self._data_exists(previous.decode()):
+                    return previous.decode()
+            return None
+
+        urns = list(await asyncio.gather(*[previous_upload(k) for k in keys]))
+        missing = [i for i, urn in enumerate(urns) if urn is None]
+        if missing:
+            sent = await self._send_upload(mime_type, [sources[i] for i in missing])
+            for index, urn in zip(missing, sent):
+                urns[index] = urn
+                store.put(
+                    UPLOADS_NAMESPACE, self._scoped_key(keys[index]), urn.encode()
+                )
+                store.put(UPLOAD_DIGESTS_NAMESPACE, urn, keys[index].encode())
+        return urns  # type: ignore[return-value]
+
+    async def _data_exists(self, data_urn: str) -> bool:
+        try:
+            await self.get_metadata(data_urn)
+        except OutropyHttpError as e:
+            if e.status_code not in MISSING_DATA_STATUSES:
+                # Says nothing about the data, and uploading again won't fix it
+                raise
+            return False
+        return True
+
+    async def _send_upload(
+        self, mime_type: str, sources: List[UploadSource]
+    ) -> List[str]:
         url = f"{self.base_url}api/data/upload"
-        files = {"file": (file_name, file_stream, "multipart/form-data")}
-        # Create the headers dictionary
+        body = MultipartBody(sources, chunk_size=self.upload_chunk_size)
+        # The size header is the length of the payload in bytes, not in characters
         headers = {
-            UPLOAD_FILE_SIZE_HEADER: str(file_size),
+            UPLOAD_FILE_SIZE_HEADER: str(sum(source.size for source in sources)),
             UPLOAD_FILE_MIME_TYPE_HEADER: mime_type,
+            **body.headers,
+            **self._auth_headers(),
         }
-        if self.api_key.startswith("ot-"):
-            headers["Authorization"] = f"Bearer {self.api_key}"
-        else:
-            headers[OUTROPY_API_KEY] = self.api_key
 
-        # Create an async HTTPX client
-        async with httpx.AsyncClient(timeout=60 * 10) as client:
+        async def send() -> Response:
+            endpoint, target = self._target(url)
+            async with self.rate_limiter.acquire(self._route_of(url)):
+                with self.balancer.track(endpoint, timed=False) as call:
+                    response = await self._http_client(Lane.BULK).post(
+                        target, headers=headers, content=body, follow_redirects=False
+                    )
+                    call.ok = response.status_code < 500
+            if not response.is_success:
+                raise OutropyHttpError.from_response(response)
+            return response
 
-            try:
-                response = await client.post(url, headers=headers, files=files)
-            except httpx.ConnectError as e:
-                raise Exception(f"Connection error to {url}") from e
+        # Uploads aren't idempotent, so only attempts that never reached the server
+        # are retried
+        try:
+            response = await self.retry_engine.run(send, idempotent=False)
+        except httpx.ConnectError as e:
+            raise Exception(f"Connection error to {url}") from e
+
+        # One URN per file, in the order the files were sent
+        returned_urns = [str(urn) for urn in response.json()["urns"]]
+        if len(returned_urns) != len(sources):
+            raise Exception(
+                f"Uploaded {len(sources)} files but got {len(returned_urns)} URNs back"
+            )
+        return returned_urns
 
-            # Raise an error if the request was unsuccessful
-            response.raise_for_status()
+    async def start_chunked_upload(
+        self, file_name: str, mime_type: str, size: int
+    ) -> str:
+        """Opens an upload sent in parts, and returns its id. See ChunkedUploader."""
+        response = await self._make_json_http_request(
+            self._build_full_url("/data/uploads/start"),
+            "POST",
+            {"file_name": file_name, "mime_type": mime_type, "size": size},
+        )
+        return str(response["upload_id"])
+
+    async def upload_part(
+        self,
+        upload_id: str,
+        part_number: int,
+        source: UploadSource,
+        start: int,
+        end: int,
+    ) -> None:
+        path = f"/data/uploads/{upload_id}/parts/{part_number}"
+        await self._send_request(
+            self._build_full_url(path),
+            "PUT",
+            headers={
+                UPLOAD_PART_OFFSET_HEADER: str(start),
+                "Content-Length": str(end - start),
+            },
+            content=source.range_body(start, end, self.upload_chunk_size),
+            lane=Lane.BULK,
+        )
 
-            # Return the JSON response from the server
-            returned_urns = response.json()
-            # TODO: why a list?
-            return str(returned_urns["urns"][0])
+    async def complete_chunked_upload(
+        self, upload_id: str, parts: List[UploadedPart]
+    ) -> OutropyUrn:
+        path = f"/data/uploads/{upload_id}/complete"
+        response = await self._make_json_http_request(
+            self._build_full_url(path),
+            "POST",
+            {"parts": [p.model_dump() for p in parts]},
+            idempotency_key=upload_id,
+            # Assembling the parts can take as long as uploading them
+            lane=Lane.BULK,
+        )
+        return str(response["urns"][0])
 
-    async def _call_inference(self, path: str, request: BaseModel) -> Dict[str, Any]:
+    async def _call_inference(
+        self,
+        path: str,
+        request: BaseModel,
+        idempotency_key: Optional[str] = None,
+        lane: Lane = Lane.CONTROL,
+    ) -> Dict[str, Any]:
         if path[0] != "/":
             raise ValueError(f"Path must start with a /, got [{path}]")
         url = f"{self.base_url}api{path}"
-        request_as_dict = recursive_convert_pydantic_to_dict(request)
-        response = await self._make_json_http_request(url, "POST", request_as_dict)
+        response = await self._make_json_http_request(
+            url, "POST", request, idempotency_key, lane
+        )
         return response
 
     async def create_task(
@@ -172,21 +697,37 @@ class OutropyApi:
         collection_name: Optional[str] = None,
     ) -> OutropyUrn:
         path = "/pipelines/create"
-        input_schema = to_schema(input_type) if input_type else None
-        output_schema = to_schema(output_type) if output_type else None
+        input_schema = cached_schema(input_type) if input_type else None
+        output_schema = cached_schema(output_type) if output_type else None
         request = CreateTaskRequest(
             task_type=task,
             name=name,
             directives=directives,
             reference_data=reference_data,
-            input_type=input_schema,
-            output_type=output_schema,
+            input_type=input_schema.schema if input_schema else None,
+            output_type=output_schema.schema if output_schema else None,
             prompt=prompt,
             examples=examples,
             collection_name=collection_name,
         )
-        response = await self._call_inference(path, request)
-        return str(response["urn"])
+        if self.state_store is None:
+            response = await self._call_inference(path, request, lane=Lane.BULK)
+            return str(response["urn"])
+
+        # An unchanged definition resolves to the task we created last time
+        fingerprint = request.fingerprint(
+            input_schema.digest if input_schema else None,
+            output_schema.digest if output_schema else None,
+        )
+        key = self._scoped_key(fingerprint)
+        known_urn = self.state_store.get(TASKS_NAMESPACE, key)
+        if known_urn is not None:
+            return known_urn.decode()
+        response = await self._call_inference(path, request, lane=Lane.BULK)
+        urn = str(response["urn"])
+        self.state_store.put(TASKS_NAMESPACE, key, urn.encode())
+        self.state_store.put(TASK_FINGERPRINTS_NAMESPACE, urn, fingerprint.encode())
+        return urn
 
     async def execute_task(
         self,
@@ -195,6 +736,7 @@ class OutropyApi:
         subject: Union[str, List[str]],
         directives: Optional[Directives] = None,
         reference_data: List[OutropyUrn] = [],
+        idempotency_key: Optional[str] = None,
     ) -> TaskExecuteResponse:
         subjects = subject if isinstance(subject, list) else [subject]
 
@@ -203,6 +745,13 @@ class OutropyApi:
                 f"Only one of subject or subjects can be provided, got [{subject}] and [{subjects}]"
             )
 
+        memo_key = await self._memo_key(task_urn, subjects, directives, reference_data)
+        if memo_key is not None:
+            memoized = await self._memoized_execution(memo_key)
+            if memoized is not None:
+                self._memoized_runs.add(memoized.urn)
+                return memoized
+
         path = "/pipelines/execute"
         request = ExecuteTaskRequest(
             task_urn=task_urn,
@@ -210,28 +759,121 @@ class OutropyApi:
             directives=directives,
             reference_data=reference_data,
         )
-        response = await self._call_inference(path, request)
-        return TaskExecuteResponse(**response)
+        response = await self._make_typed_http_request(
+            self._build_full_url(path),
+            "POST",
+            request,
+            TaskExecuteResponse,
+            idempotency_key,
+        )
+        if memo_key is not None:
+            self._memoized_runs.add(response.urn)
+            await self._memoize(EXECUTIONS_NAMESPACE, memo_key, dumpb(response))
+        return response
+
+    async def _memo_key(
+        self,
+        task_urn: str,
+        subjects: List[str],
+        directives: Optional[Directives],
+        reference_data: List[OutropyUrn],
+    ) -> Optional[str]:
+        if (
+            self.memo_policy is None
+            or self.state_store is None
+            or not self.memo_policy.applies_to(directives)
+        ):
+            return None
+        store = self.state_store
+
+        async def known_as(namespace: str, urn: str) -> str:
+            # Keyed by content rather than URN when we know it, so re-created tasks
+            # and re-uploaded subjects still hit
+            value = await store.aget(namespace, urn)
+            return urn if value is None else value.decode()
+
+        key = ExecutionKey(
+            task=await known_as(TASK_FINGERPRINTS_NAMESPACE, task_urn),
+            subjects=[await known_as(UPLOAD_DIGESTS_NAMESPACE, s) for s in subjects],
+            directives=directives,  # type: ignore[arg-type]
+            reference_data=reference_data,
+        )
+        return self._scoped_key(hashlib.sha256(dumpb(key)).hexdigest())
+
+    async def _memoized_execution(self, memo_key: str) -> Optional[TaskExecuteResponse]:
+        assert self.state_store is not None
+        memoized = await self.state_store.aget(EXECUTIONS_NAMESPACE, memo_key)
+        if memoized is None:
+            return None
+        execution = TaskExecuteResponse.model_validate_json(memoized)
+        try:
+            run = await self.get_pipeline_run(execution.urn)
+        except OutropyHttpError as e:
+            if e.status_code != 404:
+                raise
+            run = None
+        if run is None or run.status.is_failed:
+            # Only a run that succeeded, or may still succeed, is worth reusing
+            await self.state_store.adelete(EXECUTIONS_NAMESPACE, memo_key)
+            return None
+        return execution
+
+    async def _memoize(self, namespace: str, memo_key: str, value: bytes) -> None:
+        assert self.state_store is not None and self.memo_policy is not None
+        max_bytes = self.memo_policy.max_bytes
+        if len(value) > max_bytes:
+            # Would only push everything else out, and then itself
+            return
+        await self.state_store.aput(namespace, memo_key, value, self.memo_policy.ttl)
+        # Trimming scans the whole namespace, so it waits until a tenth of the budget
+        # has been written since the last time
+        self._memo_unevicted[namespace] += len(value)
+        if self._memo_unevicted[namespace] >= max_bytes // 10:
+            self._memo_unevicted[namespace] = 0
+            await self.state_store.aevict(namespace, max_bytes)
 
     async def get_pipeline_run(self, run_id: OutropyUrn) -> TaskRunResponse:
         path = f"/pipelines/runs/{run_id}"
-        response = await self._make_json_http_request(
-            f"{self.base_url}api{path}", "GET", {}
+        run = await self._make_typed_http_request(
+            self._build_full_url(path), "GET", {}, TaskRunResponse
         )
-        return TaskRunResponse(**response)
+        if run.urn in self._memoized_runs and run.results_urn is not None:
+            self._memoized_results.add(run.results_urn)
+        return run
 
     async def get_pipeline_run_input(self, run_id: OutropyUrn) -> ExecuteTaskRequest:
         path = f"/pipelines/runs/{run_id}/inputs"
-        response = await self._make_json_http_request(
-            f"{self.base_url}api{path}", "GET", {}
+        return await self._make_typed_http_request(
+            self._build_full_url(path), "GET", {}, ExecuteTaskRequest
         )
-        return ExecuteTaskRequest(**response)
 
-    async def wait_until_finishes_running(self, run_id: OutropyUrn) -> TaskRunResponse:
+    async def wait_until_finishes_running(
+        self, run_id: OutropyUrn, policy: Optional[PollingPolicy] = None
+    ) -> TaskRunResponse:
+        policy = policy or self.polling_policy
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        attempt = 0
+
         run_info = await self.get_pipeline_run(run_id)
         while run_info.status.is_running:
+            delay = policy.next_delay(
+                attempt,
+                run_info.duration,
+                self.run_durations.expected_duration(run_info.pipeline_urn),
+            )
+            if policy.deadline is not None:
+                time_left = policy.deadline - (loop.time() - started_at)
+                if time_left <= 0:
+                    raise TimeoutError(
+                        f"Pipeline run [{run_id}] still running after {policy.deadline} seconds"
+                    )
+                delay = min(delay, time_left)
+            await asyncio.sleep(delay)
+            attempt += 1
             run_info = await self.get_pipeline_run(run_id)
-            await asyncio.sleep(1)  # TODO: exponential backoff
+
+        self.run_durations.record(run_info)
         return run_info
 
     async def execute_and_wait_for_results(
@@ -242,6 +884,15 @@ class OutropyApi:
         directives: Optional[Directives] = None,
         reference_data: List[OutropyUrn] = [],
     ) -> str:
+        subjects = subject if isinstance(subject, list) else [subject]
+        memo_key = await self._memo_key(task_urn, subjects, directives, reference_data)
+        if memo_key is not None and self.state_store is not None:
+            # Only the URN, the results themselves are kept once, under the data
+            memoized = await self.state_store.aget(RESULTS_NAMESPACE, memo_key)
+            if memoized is not None:
+                self._memoized_results.add(memoized.decode())
+                return await self.download_text(memoized.decode())
+
         job = await self.execute_task(
             task_urn,
             subject=subject,
@@ -252,15 +903,56 @@ class OutropyApi:
         if response.results_urn is None:
             raise Exception(f"Pipeline run [{job.urn}] did not produce any results")
 
-        return await self.download_text(response.results_urn)
+        results = await self.download_text(response.results_urn)
+        if memo_key is not None:
+            await self._memoize(
+                RESULTS_NAMESPACE, memo_key, response.results_urn.encode()
+            )
+        return results
+
+    def prepare_execution(
+        self,
+        task_urn: str,
+        directives: Optional[Directives] = None,
+        reference_data: List[OutropyUrn] = [],
+    ) -> "PreparedExecution":
+        """A handle for running one task over many subjects, see PreparedExecution."""
+        return PreparedExecution(self, task_urn, directives, reference_data)
+
+    def execute_many(
+        self,
+        task_urn: str,
+        subjects: Iterable[Union[str, List[str]]],
+        *,
+        concurrency: int = 8,
+        ordered: bool = False,
+        directives: Optional[Directives] = None,
+        reference_data: List[OutropyUrn] = [],
+    ) -> AsyncIterator[ItemResult[Union[str, List[str]], str]]:
+        async def execute(subject: Union[str, List[str]]) -> str:
+            return await self.execute_and_wait_for_results(
+                task_urn,
+                subject=subject,
+                directives=directives,
+                reference_data=reference_data,
+            )
+
+        return bounded_map(execute, subjects, concurrency, ordered)
+
+    def download_many(
+        self,
+        data_urns: Iterable[OutropyUrn],
+        *,
+        concurrency: int = 8,
+        ordered: bool = False,
+    ) -> AsyncIterator[ItemResult[OutropyUrn, str]]:
+        return bounded_map(self.download_text, data_urns, concurrency, ordered)
 
     async def list_data_sources(self) -> List[DataSourceResponse]:
         path = "/data-sources/list"
-        response: list[dict[str, Any]] = cast(
-            list[dict[str, Any]],
-            await self._make_json_http_request(f"{self.base_url}api{path}", "GET", {}),
+        return await self._make_typed_http_request(
+            self._build_full_url(path), "GET", {}, List[DataSourceResponse]
         )
-        return [DataSourceResponse(**data_source) for data_source in response]
 
     async def set_hyperparams(self, task_urn: str, hyperparams: Dict[str, str]) -> None:
         path = f"/pipelines/{task_urn}/hyperparams"
@@ -278,10 +970,9 @@ class OutropyApi:
         request = CreateDataSourceRequest(
             name=name, description=description, directives=directives
         )
-        response = await self._make_json_http_request(
-            self._build_full_url(path), "POST", request.model_dump()
+        return await self._make_typed_http_request(
+            self._build_full_url(path), "POST", request, DataSourceResponse
         )
-        return DataSourceResponse.model_validate(response)
 
     async def set_metadata(self, data_urn: str, metadata: Dict[str, str]) -> None:
         path = f"/data/{data_urn}/metadata"
@@ -289,10 +980,9 @@ class OutropyApi:
 
     async def get_metadata(self, data_urn: str) -> DataSourceMetadata:
         path = f"/data/{data_urn}/metadata"
-        response = await self._make_json_http_request(
-            self._build_full_url(path), "GET", {}
+        return await self._make_typed_http_request(
+            self._build_full_url(path), "GET", {}, DataSourceMetadata
         )
-        return DataSourceMetadata.model_validate(response)
 
     async def create_benchmark(
         self, name: str, description: str, task_instance_urn: str, query_urns: list[str]
@@ -304,7 +994,7 @@ class OutropyApi:
             task_instance_urn=task_instance_urn,
             query_urns=query_urns,
         )
-        response = await self._call_inference(path, request)
+        response = await self._call_inference(path, request, lane=Lane.BULK)
         return str(response["urn"])
 
     async def execute_benchmark(
@@ -314,54 +1004,199 @@ class OutropyApi:
         request = BenchmarkExecuteRequest(
             benchmark_urn=benchmark_urn, hyperparams=hyperparams
         )
-        response = await self._call_inference(path, request)
-        return BenchmarkRunResponse(**response)
+        return await self._make_typed_http_request(
+            self._build_full_url(path),
+            "POST",
+            request,
+            BenchmarkRunResponse,
+            lane=Lane.BULK,
+        )
 
     async def get_benchmark_run(self, run_id: OutropyUrn) -> BenchmarkRunResponse:
         path = f"/benchmarks/runs/{run_id}"
-        response = await self._make_json_http_request(
-            self._build_full_url(path), "GET", {}
+        return await self._make_typed_http_request(
+            self._build_full_url(path), "GET", {}, BenchmarkRunResponse
         )
-        return BenchmarkRunResponse(**response)
 
     async def _make_http_request(
-        self, url: str, method: str, payload: Dict[str, str]
+        self,
+        url: str,
+        method: str,
+        payload: Union[Dict[str, Any], BaseModel],
+        idempotency_key: Optional[str] = None,
+        lane: Lane = Lane.CONTROL,
     ) -> Response:
-        headers: Dict[str, str] = {}
-        if self.api_key.startswith("ot-"):
-            headers["Authorization"] = f"Bearer {self.api_key}"
-        else:
-            headers[OUTROPY_API_KEY] = self.api_key
+        if method == "POST":
+            # Models go straight to JSON bytes, no intermediate dicts or strings
+            return await self._send_request(
+                url,
+                method,
+                headers={"Content-Type": "application/json"},
+                content=dumpb(payload),
+                idempotency_key=idempotency_key,
+                lane=lane,
+            )
+
+        async def send() -> Response:
+            return await self._send_request(
+                url,
+                method,
+                params=payload,
+                idempotency_key=idempotency_key,
+                lane=lane,
+            )
+
+        if method != "GET" or not self.coalesce_reads:
+            return await send()
+        return await self._reads.do((method, url, dumpb(payload)), send)
+
+    async def _send_request(
+        self,
+        url: str,
+        method: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        idempotency_key: Optional[str] = None,
+        lane: Lane = Lane.CONTROL,
+        **request_args: Any,
+    ) -> Response:
+        all_headers = {**(headers or {}), **self._auth_headers()}
+        if idempotency_key is not None:
+            all_headers[IDEMPOTENCY_KEY_HEADER] = idempotency_key
+        client = self._http_client(lane)
 
-        payload = recursive_convert_pydantic_to_dict(payload)
+        route = self._route_of(url)
+
+        async def send() -> Response:
+            endpoint, target = self._target(url)
+            async with self.rate_limiter.acquire(route):
+                # How long a bulk call takes says more about its payload than about
+                # the endpoint, so only control calls steer the balancer by latency
+                with self.balancer.track(endpoint, timed=lane is Lane.CONTROL) as call:
+                    response = await client.request(
+                        method, target, headers=all_headers, **request_args
+                    )
+                    call.ok = response.status_code < 500
+
+            if not response.is_success:
+                raise OutropyHttpError.from_response(response)
+            if route in RUN_CREATING_ROUTES and len(self.balancer.endpoints) > 1:
+                # The run only exists on the host that created it
+                self.balancer.pin(str(from_json(response.content)["urn"]), endpoint.url)
+            return response
 
         try:
-            async with httpx.AsyncClient(
-                timeout=60 * 10, follow_redirects=True
-            ) as client:
-                if method == "POST":
-                    response = await client.post(url, headers=headers, json=payload)
-                else:
-                    response = await client.get(url, headers=headers, params=payload)
-
-                response.raise_for_status()  # Raise an exception for HTTP errors
-                return response
-        except httpx.HTTPStatusError as e:
-            raise Exception(
-                f"HTTP error when performing a {e.request.method} {e.request.url}:  {e.response.status_code}: {e.response.text}"
-            ) from e
+            return await self.retry_engine.run(
+                send,
+                idempotent=method in ("GET", "PUT") or idempotency_key is not None,
+            )
         except httpx.ConnectError as e:
             raise Exception(f"Connection error to {url}") from e
 
+    @asynccontextmanager
+    async def _stream_http_request(self, url: str) -> AsyncGenerator[Response, None]:
+        headers = self._auth_headers()
+        client = self._http_client(Lane.BULK)
+
+        async def open_stream() -> Response:
+            endpoint, target = self._target(url)
+            with self.balancer.track(endpoint, timed=False) as call:
+                response = await client.send(
+                    client.build_request("GET", target, headers=headers), stream=True
+                )
+                call.ok = response.status_code < 500
+            if not response.is_success:
+                await response.aread()
+                await response.aclose()
+                raise OutropyHttpError.from_response(response)
+            return response
+
+        # The slot is held for as long as the body is being read
+        async with self.rate_limiter.acquire(self._route_of(url)):
+            try:
+                response = await self.retry_engine.run(open_stream)
+            except httpx.ConnectError as e:
+                raise Exception(f"Connection error to {url}") from e
+            try:
+                yield response
+            finally:
+                await response.aclose()
+
     async def _make_json_http_request(
-        self, url: str, method: str, payload: Dict[str, str]
+        self,
+        url: str,
+        method: str,
+        payload: Union[Dict[str, Any], BaseModel],
+        idempotency_key: Optional[str] = None,
+        lane: Lane = Lane.CONTROL,
     ) -> Dict[str, Any]:
-        response = await self._make_http_request(url, method, payload)
+        response = await self._make_http_request(
+            url, method, payload, idempotency_key, lane
+        )
         return response.json()  # type: ignore
 
+    async def _make_typed_http_request(
+        self,
+        url: str,
+        method: str,
+        payload: Union[Dict[str, Any], BaseModel],
+        response_type: Type[T],
+        idempotency_key: Optional[str] = None,
+        lane: Lane = Lane.CONTROL,
+    ) -> T:
+
+        async def fetch() -> T:
+            response = await self._make_http_request(
+                url, method, payload, idempotency_key, lane
+            )
+            return await self._decode(response_type, response.content)
+
+        if method != "GET" or not self.coalesce_reads:
+            return await fetch()
+        # Callers of the same read share one decoded result too, not just the response
+        key = (method, url, dumpb(payload), response_type)
+        return cast(T, await self._decoded_reads.do(key, fetch))
+
+    async def _decode(self, response_type: Type[T], content: bytes) -> T:
+        executor = self.decode_executor
+        if (
+            executor is None
+            or len(content) < self.offload_threshold
+            or (
+                isinstance(executor, ProcessPoolExecutor)
+                and not _picklable(response_type)
+            )
+        ):
+            return decode(response_type, content, self.trusted_responses)
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, decode, response_type, content, self.trusted_responses
+        )
+
     def _build_full_url(self, path: str) -> str:
         return f"{self.base_url}api{path}"
 
+    def _target(self, url: str) -> Tuple[Endpoint, str]:
+        route = self._route_of(url)
+        sticky_key = next(
+            (
+                route[len(prefix) :].split("/")[0]  # noqa: E203
+                for prefix in RUN_ROUTES
+                if route.startswith(prefix)
+            ),
+            None,
+        )
+        endpoint = self.balancer.choose(sticky_key)
+        if endpoint.url == self.base_url or not url.startswith(self.base_url):
+            return endpoint, url
+        return endpoint, endpoint.url + url[len(self.base_url) :]  # noqa: E203
+
+    def _route_of(self, url: str) -> str:
+        path = httpx.URL(url).path
+        api_root = f"{httpx.URL(self.base_url).path}api"
+        if path.startswith(api_root):
+            return path[len(api_root) :]  # noqa: E203
+        return path
+
     async def create_index(
         self,
         name: str,
@@ -376,17 +1211,85 @@ class OutropyApi:
             description=description,
             type=type,
         )
-        response = await self._make_json_http_request(
-            f"{self.base_url}api{path}", "POST", request.model_dump()
+        return await self._make_typed_http_request(
+            self._build_full_url(path),
+            "POST",
+            request,
+            IndexCreateResponse,
+            lane=Lane.BULK,
         )
-        return IndexCreateResponse.model_validate(response)
 
     async def get_data_source_by_name(self, name: str) -> Optional[DataSourceResponse]:
         path = f"/data-sources/by-name/{name}"
-        response = cast(
-            Optional[dict[str, Any]],
-            await self._make_json_http_request(f"{self.base_url}api{path}", "GET", {}),
-        )
-        if response is None:
+        response = await self._make_http_request(self._build_full_url(path), "GET", {})
+        if is_null(response.content):
             return None
-        return DataSourceResponse.model_validate(response)
+        return await self._decode(DataSourceResponse, response.content)
+
+
+class PreparedExecution:
+    """Runs one task over and over with the same directives and reference data.
+
+    The request body is serialized once, around a hole where the subjects go, and
+    the URL and headers are built once, so each submission only serializes its
+    subject URNs.
+    """
+
+    def __init__(
+        self,
+        api: OutropyApi,
+        task_urn: str,
+        directives: Optional[Directives] = None,
+        reference_data: List[OutropyUrn] = [],
+    ) -> None:
+        self.api = api
+        self.task_urn = task_urn
+        self.directives = directives
+        self.reference_data = reference_data
+        self.url = api._build_full_url("/pipelines/execute")
+        self.headers = {"Content-Type": "application/json"}
+
+        placeholder = uuid.uuid4().hex
+        template = dumpb(
+            ExecuteTaskRequest(
+                task_urn=task_urn,
+                subject_urns=[placeholder],
+                directives=directives,
+                reference_data=reference_data,
+            )
+        )
+        self._prefix, self._suffix = template.split(dumpb([placeholder]))
+
+        # Memoized executions need the whole key built, so they take the long way
+        self._memoized = api.memo_policy is not None and api.memo_policy.applies_to(
+            directives
+        )
+
+    def body(self, subject_urns: List[str]) -> bytes:
+        return self._prefix + dumpb(subject_urns) + self._suffix
+
+    async def execute(
+        self,
+        subject: Union[str, List[str]],
+        idempotency_key: Optional[str] = None,
+    ) -> TaskExecuteResponse:
+        subjects = subject if isinstance(subject, list) else [subject]
+        if len(subjects) == 0:
+            raise ValueError("At least one subject is required")
+        if self._memoized:
+            return await self.api.execute_task(
+                self.task_urn,
+                subject=subjects,
+                directives=self.directives,
+                reference_data=self.reference_data,
+                idempotency_key=idempotency_key,
+            )
+
+        response = await self.api._send_request(
+            self.url,
+            "POST",
+            headers=self.headers,
+            content=self.body(subjects),
+            idempotency_key=idempotency_key,
+        )
+        return await self.api._decode(TaskExecuteResponse, response.content)
@@ -1,3 +1,5 @@
 UPLOAD_FILE_SIZE_HEADER = "X-Outropy-Upload-Size"
 UPLOAD_FILE_MIME_TYPE_HEADER = "X-Outropy-Upload-Mime-Type"
 UPLOAD_FILE_METADATA_HEADER = "X-Outropy-Upload-Metadata"
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+UPLOAD_PART_OFFSET_HEADER = "X-Outropy-Upload-Part-Offset"
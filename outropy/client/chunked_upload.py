@@ -0,0 +1,200 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from outropy.client import outropy_state_dir
+from outropy.client.api import OutropyApi
+from outropy.client.exceptions import OutropyHttpError
+from outropy.client.multipart import UploadSource
+from outropy.client.requests import OutropyUrn, UploadedPart
+
+MIB = 1024 * 1024
+
+
+class UploadManifest(BaseModel):
+    upload_id: str
+    file_path: str
+    file_size: int
+    modified_at_ns: int
+    mime_type: str
+    parts: List[UploadedPart] = Field(
+        description="Parts the server has confirmed", default=[]
+    )
+
+    def missing_ranges(self) -> List[Tuple[int, int]]:
+        missing = []
+        cursor = 0
+        for part in sorted(self.parts, key=lambda p: p.offset):
+            if part.offset > cursor:
+                missing.append((cursor, part.offset))
+            cursor = max(cursor, part.offset + part.size)
+        if cursor < self.file_size:
+            missing.append((cursor, self.file_size))
+        return missing
+
+
+class ChunkedUploader:
+    """Uploads a large file as parts sent in parallel over the connection pool.
+
+    Part sizes adapt to the measured bandwidth so each part takes roughly
+    `target_part_seconds`. Confirmed parts are recorded in a local manifest, so an
+    interrupted upload of the same, unchanged file resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        api: OutropyApi,
+        manifest_dir: Optional[Path] = None,
+        parallelism: int = 4,
+        initial_part_size: int = 8 * MIB,
+        min_part_size: int = 1 * MIB,
+        max_part_size: int = 64 * MIB,
+        target_part_seconds: float = 2.0,
+    ) -> None:
+        self.api = api
+        self.manifest_dir = manifest_dir or outropy_state_dir() / "uploads"
+        self.parallelism = parallelism
+        self.min_part_size = min_part_size
+        self.max_part_size = max_part_size
+        self.target_part_seconds = target_part_seconds
+        self.part_size = initial_part_size
+        # Bytes per second of a single part upload, smoothed across parts
+        self.bandwidth: Optional[float] = None
+
+    async def upload(self, mime_type: str, file_path: str | Path) -> OutropyUrn:
+        path = Path(file_path)
+        source = UploadSource.from_path(path)
+        manifest = self._load_manifest(path, mime_type)
+        resumed = manifest is not None
+
+        try:
+            return await self._upload(
+                manifest or await self._start(path, mime_type), source
+            )
+        except OutropyHttpError as e:
+            if not resumed or e.status_code != 404:
+                raise
+            # The server no longer knows about the upload we were resuming
+            self._manifest_path(path).unlink(missing_ok=True)
+            return await self._upload(await self._start(path, mime_type), source)
+
+    async def _upload(self, manifest: UploadManifest, source: UploadSource) -> str:
+        await self._upload_missing_parts(manifest, source)
+        urn = await self.api.complete_chunked_upload(manifest.upload_id, manifest.parts)
+        self._manifest_path(Path(manifest.file_path)).unlink(missing_ok=True)
+        return urn
+
+    async def _start(self, path: Path, mime_type: str) -> UploadManifest:
+        stat = path.stat()
+        upload_id = await self.api.start_chunked_upload(
+            path.name, mime_type, stat.st_size
+        )
+        manifest = UploadManifest(
+            upload_id=upload_id,
+            file_path=str(path.resolve()),
+            file_size=stat.st_size,
+            modified_at_ns=stat.st_mtime_ns,
+            mime_type=mime_type,
+        )
+        self._save_manifest(manifest)
+        return manifest
+
+    async def _upload_missing_parts(
+        self, manifest: UploadManifest, source: UploadSource
+    ) -> None:
+        pending = deque(manifest.missing_ranges())
+        next_part_number = max((p.part_number for p in manifest.parts), default=0) + 1
+
+        async def worker() -> None:
+            nonlocal next_part_number
+            while pending:
+                start, end = pending.popleft()
+                if end - start > self.part_size:
+                    pending.appendleft((start + self.part_size, end))
+                    end = start + self.part_size
+                part_number = next_part_number
+                next_part_number += 1
+                await self._upload_part(manifest, source, part_number, start, end)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.parallelism)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for w in workers:
+                w.cancel()
+
+    async def _upload_part(
+        self,
+        manifest: UploadManifest,
+        source: UploadSource,
+        part_number: int,
+        start: int,
+        end: int,
+    ) -> None:
+        started_at = time.monotonic()
+        await self.api.upload_part(manifest.upload_id, part_number, source, start, end)
+        self._record_bandwidth(end - start, time.monotonic() - started_at)
+
+        manifest.parts.append(
+            UploadedPart(part_number=part_number, offset=start, size=end - start)
+        )
+        self._save_manifest(manifest)
+
+    def _record_bandwidth(self, size: int, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        measured = size / seconds
+        self.bandwidth = (
+            measured
+            if self.bandwidth is None
+            else 0.3 * measured + 0.7 * self.bandwidth
+        )
+        self.part_size = int(
+            min(
+                max(self.bandwidth * self.target_part_seconds, self.min_part_size),
+                self.max_part_size,
+            )
+        )
+
+    def _manifest_path(self, path: Path) -> Path:
+        key = hashlib.sha256(str(path.resolve()).encode()).hexdigest()
+        return self.manifest_dir / f"{key}.json"
+
+    def _load_manifest(self, path: Path, mime_type: str) -> Optional[UploadManifest]:
+        manifest_path = self._manifest_path(path)
+        if not manifest_path.exists():
+            return None
+        manifest = UploadManifest.model_validate_json(manifest_path.read_bytes())
+        stat = path.stat()
+        if (
+            manifest.file_size != stat.st_size
+            or manifest.modified_at_ns != stat.st_mtime_ns
+            or manifest.mime_type != mime_type
+        ):
+            # The file changed since we started, the parts we sent are useless
+            manifest_path.unlink()
+            return None
+        return manifest
+
+    def _save_manifest(self, manifest: UploadManifest) -> None:
+        manifest_path = self._manifest_path(Path(manifest.file_path))
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        # A temporary file of our own, so two processes resuming the same upload
+        # never replace the manifest with each other's half-written one
+        fd, tmp_name = tempfile.mkstemp(
+            dir=manifest_path.parent, prefix=f".{manifest_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(manifest.model_dump_json())
+            os.replace(tmp_name, manifest_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,98 @@
+from functools import lru_cache
+from types import UnionType
+from typing import (
+    Any,
+    Literal,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    overload,
+)
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import from_json
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def adapter_for(response_type: Any) -> TypeAdapter[Any]:
+    # Building an adapter compiles a validator, so each type only pays for it once
+    return TypeAdapter(response_type)
+
+
+@overload
+def decode(response_type: Type[T], content: bytes, trusted: bool = False) -> T: ...
+
+
+@overload
+def decode(response_type: Any, content: bytes, trusted: bool = False) -> Any: ...
+
+
+def decode(response_type: Any, content: bytes, trusted: bool = False) -> Any:
+    """Parses and validates a JSON response body straight from its bytes.
+
+    With `trusted`, models and lists of models are built with `model_construct`,
+    skipping validation altogether. That only applies to models whose fields JSON
+    already gives as they are, like strings, numbers and lists of them; models with
+    nested models, datetimes or enums are validated anyway. `response_type` can be
+    any type pydantic validates, e.g. Optional[Model] or List[Model].
+    """
+    if trusted:
+        constructed = _construct(response_type, from_json(content))
+        if constructed is not _NOT_CONSTRUCTED:
+            return constructed
+    return adapter_for(response_type).validate_json(content)
+
+
+def is_null(content: bytes) -> bool:
+    # Only a handful of bytes can spell null, so large bodies are never copied
+    return len(content) <= 16 and content.strip() == b"null"
+
+
+_NOT_CONSTRUCTED = object()
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _is_plain(annotation: Any) -> bool:
+    # Whether JSON values already have this type, with nothing to convert
+    if annotation is Any or annotation in _JSON_SCALARS or annotation in (list, dict):
+        return True
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return True
+    if origin in (Union, UnionType, list, dict):
+        return all(_is_plain(arg) for arg in get_args(annotation))
+    return False
+
+
+@lru_cache(maxsize=None)
+def _constructible(model: Type[BaseModel]) -> bool:
+    return all(_is_plain(f.annotation) for f in model.model_fields.values())
+
+
+def _is_constructible(response_type: Any) -> bool:
+    return (
+        isinstance(response_type, type)
+        and issubclass(response_type, BaseModel)
+        and _constructible(response_type)
+    )
+
+
+def _construct(response_type: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    if _is_constructible(response_type):
+        return response_type.model_construct(**value)
+    if get_origin(response_type) is Union:
+        # Optional[X] once we know the value is not None
+        non_null = [t for t in get_args(response_type) if t is not type(None)]
+        if len(non_null) == 1:
+            return _construct(non_null[0], value)
+    if get_origin(response_type) is list:
+        (item_type,) = get_args(response_type)
+        if _is_constructible(item_type):
+            return [item_type.model_construct(**item) for item in value]
+    return _NOT_CONSTRUCTED
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from httpx import Response
+
+from outropy.copypasta.resilience.retry import parse_retry_after
+
+
+class OutropyHttpError(Exception):
+    """Raised when the Outropy API answers with an error status."""
+
+    def __init__(
+        self, message: str, status_code: int, retry_after: Optional[float] = None
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, response: Response) -> "OutropyHttpError":
+        return cls(
+            f"HTTP error when performing a {response.request.method} {response.request.url}:  {response.status_code}: {response.text}",
+            response.status_code,
+            parse_retry_after(response.headers.get("Retry-After")),
+        )
@@ -0,0 +1,54 @@
+from enum import StrEnum
+
+import httpx
+from pydantic import BaseModel, Field
+
+
+class Lane(StrEnum):
+    # Small, latency sensitive calls: submits, polls, metadata
+    CONTROL = "control"
+    # Uploads and downloads of data, and calls the server can take minutes to answer
+    BULK = "bulk"
+
+
+class LaneConfig(BaseModel):
+    max_connections: int = Field(
+        description="Connections this lane can open at once", default=20, gt=0
+    )
+    max_keepalive_connections: int = Field(
+        description="Idle connections kept open for reuse", default=10, ge=0
+    )
+    keepalive_expiry: float = Field(
+        description="Seconds an idle connection is kept open", default=30.0, gt=0
+    )
+    connect_timeout: float = Field(
+        description="Seconds to wait for a connection to be established",
+        default=5.0,
+        gt=0,
+    )
+    read_timeout: float = Field(
+        description="Seconds to wait for the next chunk of the response", default=30.0
+    )
+    write_timeout: float = Field(
+        description="Seconds to wait for the next chunk of the request to be sent",
+        default=30.0,
+    )
+    pool_timeout: float = Field(
+        description="Seconds to wait for a free connection from the pool",
+        default=30.0,
+    )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
@@ -0,0 +1,39 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from outropy.client.directives import Directives
+from outropy.client.requests import OutropyUrn
+
+
+class MemoPolicy(BaseModel):
+    min_reproducibility: int = Field(
+        description="Only memoize executions whose reproducibility directive is at least this",
+        default=90,
+    )
+    ttl: Optional[float] = Field(
+        description="Seconds a memoized execution stays valid, None to keep it until evicted",
+        default=7 * 24 * 60 * 60,
+        gt=0,
+    )
+    max_bytes: int = Field(
+        description="Size each kind of memoized data is trimmed to, least recently used first",
+        default=256 * 1024 * 1024,
+        gt=0,
+    )
+
+    def applies_to(self, directives: Optional[Directives]) -> bool:
+        # Without directives the server picks, so we can't count on the same result
+        return (
+            directives is not None
+            and directives.reproducibility >= self.min_reproducibility
+        )
+
+
+class ExecutionKey(BaseModel):
+    """Everything that determines the result of a reproducible execution."""
+
+    task: str = Field(description="The task definition fingerprint, or its URN")
+    subjects: List[str] = Field(description="Content hashes, or URNs, of the subjects")
+    directives: Directives
+    reference_data: List[OutropyUrn]
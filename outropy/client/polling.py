@@ -0,0 +1,87 @@
+import math
+import random
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from outropy.client.pipeline import TaskRunResponse
+
+
+class PollingPolicy(BaseModel):
+    initial_delay: float = Field(
+        description="Seconds to wait before the first re-poll, also the shortest wait",
+        default=0.25,
+        gt=0,
+    )
+    growth_factor: float = Field(
+        description="How much the wait grows after each poll that finds the run still going",
+        default=2.0,
+        ge=1,
+    )
+    max_delay: float = Field(
+        description="Longest time to wait between two polls, in seconds",
+        default=10.0,
+        gt=0,
+    )
+    jitter: float = Field(
+        description="Random spread applied to every wait, as a fraction of it",
+        default=0.1,
+        ge=0,
+        lt=1,
+    )
+    deadline: Optional[float] = Field(
+        description="Give up waiting after this many seconds, None to wait forever",
+        default=None,
+    )
+
+    def backoff_delay(self, attempt: int) -> float:
+        if self.initial_delay >= self.max_delay:
+            return self.max_delay
+        if self.growth_factor > 1:
+            # The wait stops growing at max_delay, and the power would overflow on
+            # long runs
+            ceiling = math.log(self.max_delay / self.initial_delay, self.growth_factor)
+            attempt = min(attempt, math.ceil(ceiling))
+        return float(
+            min(self.initial_delay * self.growth_factor**attempt, self.max_delay)
+        )
+
+    def next_delay(
+        self, attempt: int, elapsed: float, expected_duration: Optional[float] = None
+    ) -> float:
+        """How long to sleep before the next poll.
+
+        When we have an idea of how long the run takes, we sleep until it is expected
+        to finish instead of backing off blindly. Once a run is overdue we fall back to
+        plain exponential backoff.
+        """
+        delay = self.backoff_delay(attempt)
+        if expected_duration is not None and expected_duration > elapsed:
+            delay = min(
+                max(expected_duration - elapsed, self.initial_delay), self.max_delay
+            )
+        if self.jitter > 0:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return delay
+
+
+class RunDurationHistory:
+    """Exponentially weighted moving average of how long runs take, per pipeline."""
+
+    def __init__(self, smoothing: float = 0.3) -> None:
+        self.smoothing = smoothing
+        self.durations: Dict[str, float] = {}
+
+    def record(self, run: TaskRunResponse) -> None:
+        if not run.status.is_successful:
+            return
+        previous = self.durations.get(run.pipeline_urn)
+        if previous is None:
+            self.durations[run.pipeline_urn] = run.duration
+        else:
+            self.durations[run.pipeline_urn] = (
+                self.smoothing * run.duration + (1 - self.smoothing) * previous
+            )
+
+    def expected_duration(self, pipeline_urn: str) -> Optional[float]:
+        return self.durations.get(pipeline_urn)
@@ -1,3 +1,4 @@
+import hashlib
 from enum import StrEnum
 from typing import Any, List, Optional, Tuple
 
@@ -5,6 +6,7 @@ from pydantic import BaseModel, Field
 
 from outropy.client.directives import Directives
 from outropy.copypasta.json.json import JSON_OBJECT
+from outropy.types.pydantic_to_schema import schema_digest
 
 OutropyUrn = str
 # TODO: this is too broad, need top be at least serializable to json
@@ -58,6 +60,26 @@ class CreateTaskRequest(BaseModel):
         default=None,
     )
 
+    def fingerprint(
+        self, input_digest: Optional[str] = None, output_digest: Optional[str] = None
+    ) -> str:
+        """Any change to the definition, however small, gives a new fingerprint.
+
+        The schemas count through their `schema_digest`. Callers that built them with
+        `cached_schema` pass its digests, so the schemas aren't serialized again.
+        """
+        fingerprint = hashlib.sha256(
+            self.model_dump_json(exclude={"input_type", "output_type"}).encode()
+        )
+        for schema, digest in (
+            (self.input_type, input_digest),
+            (self.output_type, output_digest),
+        ):
+            if digest is None and schema is not None:
+                digest = schema_digest(schema)
+            fingerprint.update(f"\0{digest or ''}".encode())
+        return fingerprint.hexdigest()
+
 
 class ExecuteTaskRequest(BaseModel):
     task_urn: str = Field(description="The URN of the task to run")
@@ -101,3 +123,9 @@ class CreateIndexRequest(BaseModel):
         default=None,
     )
     type: IndexerType = Field(description="The type of index to create")
+
+
+class UploadedPart(BaseModel):
+    part_number: int
+    offset: int
+    size: int
@@ -0,0 +1,204 @@
+import asyncio
+import heapq
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from outropy.client.api import OutropyApi
+from outropy.client.pipeline import TaskRunResponse
+from outropy.client.polling import PollingPolicy
+from outropy.client.requests import OutropyUrn
+
+
+class _TrackedRun:
+    def __init__(
+        self,
+        run_id: OutropyUrn,
+        future: "asyncio.Future[TaskRunResponse]",
+        started_at: float,
+    ) -> None:
+        self.run_id = run_id
+        self.future = future
+        self.started_at = started_at
+        self.attempt = 0
+
+
+class RunWaiter:
+    """Waits on many pipeline runs with a single polling loop.
+
+    Instead of one `wait_until_finishes_running` loop per run, every tracked run sits
+    in a single schedule ordered by when it should be polled next. As soon as a run is
+    seen finished we start downloading its results, so downloads overlap with the
+    polls for the runs that are still going. Finished downloads are held until
+    `results` asks for them, up to `max_prefetched_results` of them; past that the
+    oldest are dropped and downloaded again if asked for.
+    """
+
+    def __init__(
+        self,
+        api: OutropyApi,
+        policy: Optional[PollingPolicy] = None,
+        max_concurrent_polls: int = 16,
+        prefetch_results: bool = True,
+        max_prefetched_results: int = 64,
+    ) -> None:
+        self.api = api
+        self.policy = policy or api.polling_policy
+        self.prefetch_results = prefetch_results
+        self.max_prefetched_results = max_prefetched_results
+        self._poll_slots = asyncio.Semaphore(max_concurrent_polls)
+        self._tracked: Dict[OutropyUrn, _TrackedRun] = {}
+        self._schedule: List[Tuple[float, int, OutropyUrn]] = []
+        self._sequence = 0
+        self._polling: Set["asyncio.Task[None]"] = set()
+        # Downloads in flight and finished ones nobody asked for yet, oldest first
+        self._downloads: Dict[OutropyUrn, "asyncio.Task[str]"] = {}
+        self._wake_up = asyncio.Event()
+        self._loop_task: Optional["asyncio.Task[None]"] = None
+
+    async def __aenter__(self) -> "RunWaiter":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def track(self, run_id: OutropyUrn) -> "asyncio.Future[TaskRunResponse]":
+        tracked = self._tracked.get(run_id)
+        if tracked is not None:
+            return tracked.future
+
+        loop = asyncio.get_running_loop()
+        tracked = _TrackedRun(run_id, loop.create_future(), loop.time())
+        self._tracked[run_id] = tracked
+        self._schedule_poll(run_id, loop.time())
+
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run_schedule())
+        return tracked.future
+
+    async def wait_all(self, run_ids: Sequence[OutropyUrn]) -> List[TaskRunResponse]:
+        return list(await asyncio.gather(*[self.track(r) for r in run_ids]))
+
+    async def wait_any(self, run_ids: Sequence[OutropyUrn]) -> TaskRunResponse:
+        if len(run_ids) == 0:
+            raise ValueError("wait_any needs at least one run")
+        done, _ = await asyncio.wait(
+            [self.track(r) for r in run_ids], return_when=asyncio.FIRST_COMPLETED
+        )
+        return next(iter(done)).result()
+
+    async def as_completed(
+        self, run_ids: Sequence[OutropyUrn]
+    ) -> AsyncIterator[TaskRunResponse]:
+        for finished in asyncio.as_completed([self.track(r) for r in run_ids]):
+            yield await finished
+
+    async def results(self, run: TaskRunResponse) -> str:
+        if run.results_urn is None:
+            raise Exception(f"Pipeline run [{run.urn}] did not produce any results")
+        download = self._downloads.pop(run.urn, None)
+        if download is None:
+            return await self.api.download_text(run.results_urn)
+        return await download
+
+    async def aclose(self) -> None:
+        tasks: List["asyncio.Task[Any]"] = [
+            *self._polling,
+            *self._downloads.values(),
+        ]
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for tracked in self._tracked.values():
+            tracked.future.cancel()
+        self._tracked.clear()
+        self._schedule.clear()
+        self._downloads.clear()
+
+    def _schedule_poll(self, run_id: OutropyUrn, when: float) -> None:
+        self._sequence += 1
+        heapq.heappush(self._schedule, (when, self._sequence, run_id))
+        self._wake_up.set()
+
+    async def _run_schedule(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._tracked:
+            self._wake_up.clear()
+            now = loop.time()
+            while self._schedule and self._schedule[0][0] <= now:
+                _, _, run_id = heapq.heappop(self._schedule)
+                if run_id in self._tracked:
+                    task = asyncio.create_task(self._poll(self._tracked[run_id]))
+                    self._polling.add(task)
+                    task.add_done_callback(self._polling.discard)
+
+            timeout = self._schedule[0][0] - now if self._schedule else None
+            try:
+                await asyncio.wait_for(self._wake_up.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, tracked: _TrackedRun) -> None:
+        try:
+            async with self._poll_slots:
+                run = await self.api.get_pipeline_run(tracked.run_id)
+            self._handle(tracked, run)
+        except Exception as e:
+            self._fail(tracked, e)
+
+    def _handle(self, tracked: _TrackedRun, run: TaskRunResponse) -> None:
+        loop = asyncio.get_running_loop()
+        if not run.status.is_running:
+            self.api.run_durations.record(run)
+            if self.prefetch_results and run.results_urn is not None:
+                self._prefetch(run.urn, run.results_urn)
+            self._resolve(tracked, run)
+            return
+
+        delay = self.policy.next_delay(
+            tracked.attempt,
+            run.duration,
+            self.api.run_durations.expected_duration(run.pipeline_urn),
+        )
+        if self.policy.deadline is not None:
+            time_left = self.policy.deadline - (loop.time() - tracked.started_at)
+            if time_left <= 0:
+                self._fail(
+                    tracked,
+                    TimeoutError(
+                        f"Pipeline run [{tracked.run_id}] still running after {self.policy.deadline} seconds"
+                    ),
+                )
+                return
+            delay = min(delay, time_left)
+        tracked.attempt += 1
+        self._schedule_poll(tracked.run_id, loop.time() + delay)
+
+    def _prefetch(self, run_id: OutropyUrn, results_urn: OutropyUrn) -> None:
+        download = asyncio.create_task(self.api.download_text(results_urn))
+        self._downloads[run_id] = download
+
+        def finished(task: "asyncio.Task[str]") -> None:
+            if self._downloads.get(run_id) is not task:
+                return
+            # A failed prefetch is retried by `results`, if anyone asks for them
+            if task.cancelled() or task.exception() is not None:
+                del self._downloads[run_id]
+                return
+            held = [r for r, t in self._downloads.items() if t.done()]
+            for dropped in held[: len(held) - self.max_prefetched_results]:
+                del self._downloads[dropped]
+
+        download.add_done_callback(finished)
+
+    def _resolve(self, tracked: _TrackedRun, run: TaskRunResponse) -> None:
+        self._tracked.pop(tracked.run_id, None)
+        if not tracked.future.done():
+            tracked.future.set_result(run)
+        self._wake_up.set()
+
+    def _fail(self, tracked: _TrackedRun, exception: BaseException) -> None:
+        self._tracked.pop(tracked.run_id, None)
+        if not tracked.future.done():
+            tracked.future.set_exception(exception)
+        self._wake_up.set()
@@ -0,0 +1,1034 @@
+import asyncio
+import importlib.util
+import json
+import os
+import re
+import tempfile
+import unittest
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, List, Set
+
+import httpx
+from pydantic import BaseModel
+
+from outropy.client.api import DATA_NAMESPACE, RESULTS_NAMESPACE, OutropyApi
+from outropy.client.api_headers import (
+    IDEMPOTENCY_KEY_HEADER,
+    UPLOAD_FILE_MIME_TYPE_HEADER,
+    UPLOAD_FILE_SIZE_HEADER,
+)
+from outropy.client.directives import Directives
+from outropy.client.exceptions import OutropyHttpError
+from outropy.client.lanes import Lane, LaneConfig
+from outropy.client.memo import MemoPolicy
+from outropy.client.multipart import UploadSource
+from outropy.client.polling import PollingPolicy
+from outropy.client.requests import CreateTaskRequest, IndexerType, TaskNames
+from outropy.copypasta.cache.content_cache import ContentCache
+from outropy.copypasta.cache.persistent_store import PersistentStore
+from outropy.copypasta.resilience.rate_limit import RateLimit
+from outropy.copypasta.resilience.retry import Backoff, RetryPolicy
+from outropy.types.pydantic_to_schema import cached_schema
+
+
+class Suggestion(BaseModel):
+    file: str
+
+
+class Suggestions(BaseModel):
+    items: List[Suggestion]
+
+
+def run_response(urn: str, status: str = "COMPLETED") -> dict[str, object]:
+    return {
+        "urn": urn,
+        "pipeline_urn": "urn:pipeline",
+        "pipeline_version_urn": "urn:pipeline-version",
+        "href": f"http://localhost/runs/{urn}",
+        "results_urn": f"{urn}-results",
+        "created_at": "2024-01-01T00:00:00",
+        "updated_at": "2024-01-01T00:00:01",
+        "duration": 1.0,
+        "pipeline_name": "pipeline",
+        "task_type": "transform",
+        "task_icon": "icon",
+        "pipeline_version_name": "v1",
+        "status_str": status,
+        "status_description": status.lower(),
+    }
+
+
+class TestOutropyApiSession(unittest.IsolatedAsyncioTestCase):
+    async def test_reuses_one_client_across_requests(self) -> None:
+        seen: List[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(200, json=run_response("run-1"))
+
+        api = OutropyApi(
+            "ot-key", "http://api.test", transport=httpx.MockTransport(handler)
+        )
+        async with api:
+            client = api._http_client()
+            await api.get_pipeline_run("run-1")
+            await api.get_pipeline_run("run-1")
+            self.assertIs(client, api._http_client())
+
+        self.assertTrue(client.is_closed)
+        self.assertEqual(2, len(seen))
+        self.assertEqual("Bearer ot-key", seen[0].headers["Authorization"])
+
+    async def test_reopens_after_aclose(self) -> None:
+        api = OutropyApi(
+            "key",
+            "http://api.test",
+            transport=httpx.MockTransport(lambda _: httpx.Response(200, text="hello")),
+        )
+        self.assertEqual("hello", await api.download_text("urn:data"))
+        first = api._http_client()
+        await api.aclose()
+        self.assertEqual("hello", await api.download_text("urn:data"))
+        self.assertIsNot(first, api._http_client())
+        await api.aclose()
+
+    def test_configures_pool_limits(self) -> None:
+        api = OutropyApi(
+            "key", max_connections=7, max_keepalive_connections=3, keepalive_expiry=9
+        )
+        self.assertEqual(7, api.limits.max_connections)
+        self.assertEqual(3, api.limits.max_keepalive_connections)
+        self.assertEqual(9, api.limits.keepalive_expiry)
+
+
+class TestOutropyApiLanes(unittest.IsolatedAsyncioTestCase):
+    def api(self, seen: List[httpx.Request]) -> OutropyApi:
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            if request.url.path == "/api/benchmarks/execute":
+                return httpx.Response(
+                    200,
+                    json={
+                        "urn": "urn:benchmark-run",
+                        "status": "scheduled",
+                        "score_stats": None,
+                        "execution_time_stats": None,
+                        "llm_cost_stats": None,
+                        "hyperparams": {},
+                    },
+                )
+            return httpx.Response(
+                200, json={**run_response("run-1"), "href": "http://api.test/index"}
+            )
+
+        return OutropyApi(
+            "key",
+            "http://api.test",
+            transport=httpx.MockTransport(handler),
+            timeout=300,
+            control_lane=LaneConfig(read_timeout=5),
+        )
+
+    async def test_keeps_bulk_transfers_in_their_own_lane(self) -> None:
+        async with self.api([]) as api:
+            await api.download_text("urn:data")
+            self.assertEqual([Lane.CONTROL, Lane.BULK], list(api._clients))
+            await api.get_pipeline_run("run-1")
+            self.assertEqual(2, len(api._clients))
+
+            bulk = api._http_client(Lane.BULK)
+            control = api._http_client(Lane.CONTROL)
+            self.assertIsNot(bulk, control)
+            self.assertEqual(300, bulk.timeout.read)
+            self.assertEqual(10, bulk.timeout.connect)
+            self.assertEqual(5, control.timeout.read)
+
+        self.assertTrue(bulk.is_closed and control.is_closed)
+
+    def test_splits_the_connection_budget_between_lanes(self) -> None:
+        api = OutropyApi("key", max_connections=100, timeout=600)
+        control, bulk = api.lanes[Lane.CONTROL], api.lanes[Lane.BULK]
+        self.assertEqual((20, 80), (control.max_connections, bulk.max_connections))
+        self.assertEqual(
+            (10, 10),
+            (control.max_keepalive_connections, bulk.max_keepalive_connections),
+        )
+        self.assertEqual(100, api.limits.max_connections)
+        self.assertEqual(20, api.limits.max_keepalive_connections)
+        # Only the bulk lane waits as long as `timeout`
+        self.assertEqual(LaneConfig().read_timeout, control.read_timeout)
+        self.assertEqual(600, bulk.read_timeout)
+
+        api = OutropyApi("key", max_connections=10, control_lane=LaneConfig())
+        self.assertEqual(20, api.lanes[Lane.CONTROL].max_connections)
+        self.assertEqual(1, api.lanes[Lane.BULK].max_connections)
+        self.assertEqual(21, api.limits.max_connections)
+
+    async def test_sends_slow_calls_through_the_bulk_lane(self) -> None:
+        seen: List[httpx.Request] = []
+        async with self.api(seen) as api:
+            await api.get_pipeline_run("run-1")
+            await api.create_task(
+                task=TaskNames.TRANSFORM, name="summarize", prompt="p" * 10_000
+            )
+            await api.create_index(
+                "index", "urn:data-source", IndexerType.SEMANTIC_TEXT
+            )
+            await api.execute_benchmark("urn:benchmark", {})
+
+        read_timeouts = [r.extensions["timeout"]["read"] for r in seen]
+        self.assertEqual([5, 300, 300, 300], read_timeouts)
+
+
+class TestOutropyApiUnixSocket(unittest.IsolatedAsyncioTestCase):
+    async def test_sends_requests_over_the_socket(self) -> None:
+        seen: List[bytes] = []
+
+        async def serve(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            while request_line := await reader.readline():
+                seen.append(request_line.strip())
+                while (await reader.readline()).strip():
+                    pass
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello")
+                await writer.drain()
+            writer.close()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "api.sock")
+            server = await asyncio.start_unix_server(serve, path)
+            async with server:
+                async with OutropyApi("key", f"unix://{path}") as api:
+                    self.assertEqual("http://localhost/", api.base_url)
+                    self.assertEqual("hello", await api.download_text("urn:a"))
+                    self.assertEqual("hello", await api.download_text("urn:b"))
+
+        self.assertEqual(
+            [b"GET /api/data/urn:a HTTP/1.1", b"GET /api/data/urn:b HTTP/1.1"], seen
+        )
+
+    def test_cannot_be_balanced_with_other_endpoints(self) -> None:
+        with self.assertRaises(ValueError):
+            OutropyApi("key", ["unix:///tmp/api.sock", "http://api.test"])
+
+
+class TestOutropyApiHttp2(unittest.IsolatedAsyncioTestCase):
+    async def test_reports_negotiated_protocol(self) -> None:
+        api = OutropyApi(
+            "key",
+            "http://api.test",
+            transport=httpx.MockTransport(
+                lambda _: httpx.Response(
+                    200, text="ok", extensions={"http_version": b"HTTP/2"}
+                )
+            ),
+        )
+        async with api:
+            self.assertIsNone(api.negotiated_http_version)
+            await api.download_text("urn:a")
+            await api.download_text("urn:b")
+
+        self.assertEqual("HTTP/2", api.negotiated_http_version)
+        self.assertEqual({"HTTP/2": 2}, dict(api.http_versions))
+
+    def test_http2_requires_h2(self) -> None:
+        if importlib.util.find_spec("h2") is not None:
+            self.assertTrue(OutropyApi("key", http2=True).http2)
+        else:
+            with self.assertRaises(ImportError):
+                OutropyApi("key", http2=True)
+
+
+class TestOutropyApiPolling(unittest.IsolatedAsyncioTestCase):
+    async def test_polls_until_the_run_finishes(self) -> None:
+        statuses = ["RUNNING", "RUNNING", "COMPLETED"]
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=run_response("run-1", statuses.pop(0)))
+
+        policy = PollingPolicy(initial_delay=0.001, max_delay=0.001, jitter=0)
+        async with OutropyApi(
+            "key", "http://api.test", transport=httpx.MockTransport(handler)
+        ) as api:
+            run = await api.wait_until_finishes_running("run-1", policy)
+
+        self.assertTrue(run.status.is_successful)
+        self.assertEqual([], statuses)
+        self.assertEqual(1.0, api.run_durations.expected_duration("urn:pipeline"))
+
+    async def test_gives_up_after_the_deadline(self) -> None:
+        policy = PollingPolicy(initial_delay=0.01, jitter=0, deadline=0.05)
+        async with OutropyApi(
+            "key",
+            "http://api.test",
+            transport=httpx.MockTransport(
+                lambda _: httpx.Response(200, json=run_response("run-1", "RUNNING"))
+            ),
+        ) as api:
+            with self.assertRaises(TimeoutError):
+                await api.wait_until_finishes_running("run-1", policy)
+
+
+class TestOutropyApiFanOut(unittest.IsolatedAsyncioTestCase):
+    async def test_download_many_reports_failures_per_item(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("missing"):
+                return httpx.Response(404, text="not found")
+            return httpx.Response(200, text=request.url.path.rsplit("/", 1)[-1])
+
+        async with OutropyApi(
+            "key", "http://api.test", transport=httpx.MockTransport(handler)
+        ) as api:
+            results = [
+                r
+                async for r in api.download_many(
+                    ["a", "missing", "b"], concurrency=2, ordered=True
+                )
+            ]
+
+        self.assertEqual(["a", None, "b"], [r.value for r in results])
+        self.assertFalse(results[1].ok)
+
+
+class TestOutropyApiCoalescing(unittest.IsolatedAsyncioTestCase):
+    def api(self, seen: List[str], coalesce_reads: bool = True) -> OutropyApi:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.url.path)
+            await asyncio.sleep(0.01)
+            if request.url.path.startswith("/api/data/"):
+                return httpx.Response(200, text="result")
+            return httpx.Response(200, json=run_response("urn:run"))
+
+        return OutropyApi(
+            "key",
+            "http://api.test",
+            transport=httpx.MockTransport(handler),
+            coalesce_reads=coalesce_reads,
+        )
+
+    async def test_concurrent_identical_reads_share_one_request(self) -> None:
+        seen: List[str] = []
+        async with self.api(seen) as api:
+            runs = await asyncio.gather(
+                *[api.get_pipeline_run("urn:run") for _ in range(10)]
+            )
+            texts = await asyncio.gather(
+                *[api.download_text("urn:data") for _ in range(5)]
+            )
+
+        self.assertEqual(["/api/pipelines/runs/urn:run", "/api/data/urn:data"], seen)
+        self.assertTrue(all(run is runs[0] for run in runs))
+        self.assertEqual(["result"] * 5, texts)
+
+    async def test_can_be_turned_off(self) -> None:
+        seen: List[str] = []
+        async with self.api(seen, coalesce_reads=False) as api:
+            await asyncio.gather(*[api.get_pipeline_run("urn:run") for _ in range(3)])
+        self.assertEqual(3, len(seen))
+
+
+class TestOutropyApiMemoization(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.seen: List[str] = []
+        self.store = PersistentStore(":memory:")
+
+    def api(self) -> OutropyApi:
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.seen.append(f"{request.method} {request.url.path}")
+            if request.url.path == "/api/pipelines/execute":
+                return httpx.Response(200, json={"urn": "urn:run", "href": "href"})
+            if request.url.path.startswith("/api/data/"):
+                return httpx.Response(200, content=b'{"file": "review.md"}')
+            return httpx.Response(200, json=run_response("urn:run"))
+
+        return OutropyApi(
+            "key",
+            "http://api.test",
+            transport=httpx.MockTransport(handler),
+            state_store=self.store,
+            memo_policy=MemoPolicy(),
+        )
+
+    async def test_reuses_results_of_reproducible_executions(self) -> None:
+        directives = Directives(reproducibility=100)
+        for _ in range(2):
+            async with self.api() as api:
+                results = await api.execute_and_wait_for_results(
+                    "urn:task", subject="urn:diff", directives=directives
+                )
+                self.assertEqual('{"file": "review.md"}', results)
+
+        self.assertEqual(
+            [
+                "POST /api/pipelines/execute",
+                "GET /api/pipelines/runs/urn:run",
+                "GET /api/data/urn:run-results",
+            ],
+            self.seen,
+        )
+
+    async def test_reuses_runs_that_did_not_fail(self) -> None:
+        async with self.api() as api:
+            for _ in range(2):
+                execution = await api.execute_task(
+                    "urn:task",
+                    subject="urn:diff",
+                    directives=Directives(reproducibility=95),
+                )
+                self.assertEqual("urn:run", execution.urn)
+
+        self.assertEqual(
+            ["POST /api/pipelines/execute", "GET /api/pipelines/runs/urn:run"],
+            self.seen,
+        )
+
+    async def test_keeps_results_of_memoized_runs_across_processes(self) -> None:
+        for _ in range(2):
+            # A fresh client has nothing in its in-memory content cache
+            async with self.api() as api:
+                execution = await api.execute_task(
+                    "urn:task",
+                    subject="urn:diff",
+                    directives=Directives(reproducibility=100),
+                )
+                run = await api.wait_until_finishes_running(execution.urn)
+                assert run.results_urn is not None
+                result = await api.download_object(Suggestion, run.results_urn)
+                self.assertEqual(Suggestion(file="review.md"), result)
+        self.assertEqual(1, self.seen.count("GET /api/data/urn:run-results"))
+
+    async def test_keeps_results_once_and_nothing_else(self) -> None:
+        async with self.api() as api:
+            await api.download_object(Suggestion, "urn:other")
+            await api.execute_and_wait_for_results(
+                "urn:task", subject="urn:diff", directives=Directives()
+            )
+        self.assertEqual(0, self.store.size(DATA_NAMESPACE))
+
+        async with self.api() as api:
+            await api.execute_and_wait_for_results(
+                "urn:task",
+                subject="urn:diff",
+                directives=Directives(reproducibility=100),
+            )
+        self.assertEqual(len(b'{"file": "review.md"}'), self.store.size(DATA_NAMESPACE))
+        self.assertEqual(len(b"urn:run-results"), self.store.size(RESULTS_NAMESPACE))
+
+    async def test_trims_once_a_tenth_of_the_budget_was_written(self) -> None:
+        trims: List[str] = []
+
+        class CountingStore(PersistentStore):
+            def evict(self, namespace: str, max_bytes: int) -> int:
+                trims.append(namespace)
+                return super().evict(namespace, max_bytes)
+
+        async with OutropyApi(
+            "key",
+            "http://api.test",
+            state_store=CountingStore(":memory:"),
+            memo_policy=MemoPolicy(max_bytes=100),
+        ) as api:
+            for n in range(5):
+                await api._memoize(DATA_NAMESPACE, f"key-{n}", b"12345")
+        self.assertEqual([DATA_NAMESPACE] * 2, trims)
+
+    async def test_leaves_other_executions_alone(self) -> None:
+        async with self.api() as api:
+            for directives in [None, Directives(reproducibility=50)] * 2:
+                await api.execute_task(
+                    "urn:task", subject="urn:diff", directives=directives
+                )
+        self.assertEqual(["POST /api/pipelines/execute"] * 4, self.seen)
+
+    def test_requires_a_state_store(self) -> None:
+        with self.assertRaises(ValueError):
+            OutropyApi("key", "http://api.test", memo_policy=MemoPolicy())
+
+
+class TestOutropyApiRateLimits(unittest.IsolatedAsyncioTestCase):
+    async def test_limits_requests_by_route_family(self) -> None:
+        api = OutropyApi(
+            "key",
+            "http://api.test/prefix",
+            transport=httpx.MockTransport(lambda _: httpx.Response(200, text="ok")),
+            rate_limits={"/data/*": RateLimit(max_in_flight=1)},
+        )
+        async with api:
+            await api.download_text("urn:a")
+            await api.download_text("urn:b")
+
+        self.assertEqual(
+            "/data/urn:a", api._route_of("http://api.test/prefix/api/data/urn:a")
+        )
+        self.assertEqual(2, api.rate_limiter.stats()["/data/"].acquired)
+
+
+class TestOutropyApiEndpoints(unittest.IsolatedAsyncioTestCase):
+    async def test_runs_stick_to_the_endpoint_that_created_them(self) -> None:
+        seen: List[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(f"{request.url.host} {request.url.path}")
+            if request.url.path == "/api/pipelines/execute":
+                urn = f"run-{len(seen)}@{request.url.host}"
+                return httpx.Response(200, json={"urn": urn, "href": "href"})
+            urn = request.url.path.rsplit("/", 1)[-1]
+            return httpx.Response(200, json=run_response(urn))
+
+        api = OutropyApi(
+            "key",
+            ["http://a.test", "http://b.test/"],
+            transport=httpx.MockTransport(handler),
+        )
+        async with api:
+            runs = await asyncio.gather(
+                *(api.execute_task("urn:task", subject="urn:s") for _ in range(4))
+            )
+            for run in runs:
+                await api.get_pipeline_run(run.urn)
+
+        self.assertEqual({"a.test", "b.test"}, {line.split()[0] for line in seen[:4]})
+        for line in seen[4:]:
+            host, path = line.split()
+            self.assertTrue(path.endswith(f"@{host}"))
+
+    async def test_ejects_failing_endpoints(self) -> None:
+        seen: List[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.url.host)
+            if request.url.host == "b.test":
+                return httpx.Response(500, text="down")
+            return httpx.Response(200, json=run_response("run"))
+
+        api = OutropyApi(
+            "key",
+            ["http://a.test", "http://b.test"],
+            transport=httpx.MockTransport(handler),
+        )
+        async with api:
+            for i in range(10):
+                try:
+                    await api.get_pipeline_run(f"run-{i}")
+                except OutropyHttpError:
+                    pass
+            ejected = api.balancer.endpoints[1]
+            self.assertGreater(ejected.ejected_until, 0)
+
+            seen.clear()
+            for i in range(5):
+                await api.get_pipeline_run(f"run-{i}")
+        self.assertEqual(["a.test"] * 5, seen)
+
+    async def test_times_only_control_calls(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.startswith("/api/data"):
+                await asyncio.sleep(0.05)
+            return httpx.Response(200, json=run_response("run"))
+
+        api = OutropyApi(
+            "key",
+            ["http://a.test", "http://b.test"],
+            transport=httpx.MockTransport(handler),
+        )
+        async with api:
+            await asyncio.gather(*(api.download_text(f"urn:{i}") for i in range(4)))
+            self.assertEqual([None, None], [e.latency for e in api.balancer.endpoints])
+
+            await asyncio.gather(*(api.get_pipeline_run(f"run-{i}") for i in range(4)))
+        for endpoint in api.balancer.endpoints:
+            self.assertIsNotNone(endpoint.latency)
+            self.assertLess(endpoint.latency or 0, 0.05)
+
+
+class TestOutropyApiRetries(unittest.IsolatedAsyncioTestCase):
+    def api(self, statuses: List[int], seen: List[httpx.Request]) -> OutropyApi:
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            status = statuses.pop(0) if statuses else 200
+            return httpx.Response(status, json={"urn": "run-1", "href": "href"})
+
+        fast = Backoff(max_attempts=3, base_delay=0.001, max_delay=0.001)
+        return OutropyApi(
+            "key",
+            "http://api.test",
+            transport=httpx.MockTransport(handler),
+            retry_policy=RetryPolicy(status_backoffs={502: fast, 503: fast}),
+        )
+
+    async def test_retries_gets_on_transient_errors(self) -> None:
+        seen: List[httpx.Request] = []
+        async with self.api([502, 503], seen) as api:
+            await api.download_text("urn:data")
+        self.assertEqual(3, len(seen))
+
+    async def test_surfaces_status_after_giving_up(self) -> None:
+        seen: List[httpx.Request] = []
+        async with self.api([503, 503, 503], seen) as api:
+            with self.assertRaises(OutropyHttpError) as raised:
+                await api.download_text("urn:data")
+        self.assertEqual(503, raised.exception.status_code)
+
+    async def test_retries_posts_only_with_an_idempotency_key(self) -> None:
+        seen: List[httpx.Request] = []
+        async with self.api([503, 503], seen) as api:
+            with self.assertRaises(OutropyHttpError):
+                await api.execute_task("urn:task", subject="urn:subject")
+            self.assertEqual(1, len(seen))
+
+            response = await api.execute_task(
+                "urn:task", subject="urn:subject", idempotency_key="key-1"
+            )
+        self.assertEqual("run-1", response.urn)
+        self.assertEqual(3, len(seen))
+        self.assertEqual("key-1", seen[-1].headers[IDEMPOTENCY_KEY_HEADER])
+
+    async def test_retries_posts_that_waited_too_long_for_a_connection(self) -> None:
+        attempts: List[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(request)
+            if len(attempts) == 1:
+                raise httpx.PoolTimeout("no free connection", request=request)
+            return httpx.Response(200, json=run_response("run-1"))
+
+        # With the default policy: the request never left, so the POST is safe to send
+        async with OutropyApi(
+            "key", "http://api.test", transport=httpx.MockTransport(handler)
+        ) as api:
+            response = await api.execute_task("urn:task", subject="urn:subject")
+        self.assertEqual("run-1", response.urn)
+        self.assertEqual(2, len(attempts))
+
+
+class TestOutropyApiRequestBodies(unittest.IsolatedAsyncioTestCase):
+    async def test_sends_models_as_json_bytes(self) -> None:
+        seen: List[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(200, json={"urn": "urn:task"})
+
+        async with OutropyApi(
+            "key", "http://api.test", transport=httpx.MockTransport(handler)
+        ) as api:
+            await api.create_task(
+                task=TaskNames.TRANSFORM,
+                name="task",
+                prompt="Answer «this»",
+                examples=[("q", "a")],
+            )
+
+        body = json.loads(seen[0].content)
+        self.assertEqual("application/json", seen[0].headers["Content-Type"])
+        self.assertEqual("Answer «this»", body["prompt"])
+        self.assertEqual([["q", "a"]], body["examples"])
+
+
+class TestOutropyApiTaskCache(unittest.IsolatedAsyncioTestCase):
+    async def test_reuses_unchanged_task_definitions(self) -> None:
+        seen: List[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(200, json={"urn": f"urn:task-{len(seen)}"})
+
+        store = PersistentStore(":memory:")
+
+        async def create(
+            prompt: str,
+            endpoint: str = "http://api.test",
+            output_type: type[BaseModel] = Suggestion,
+        ) -> str:
+            async with OutropyApi(
+                "key",
+                endpoint,
+                transport=httpx.MockTransport(handler),
+                state_store=store,
+            ) as api:
+                return await api.create_task(
+                    task=TaskNames.TRANSFORM,
+                    name="task",
+                    prompt=prompt,
+                    output_type=output_type,
+                )
+
+        self.assertEqual("urn:task-1", await create("Summarize"))
+        self.assertEqual("urn:task-1", await create("Summarize"))
+        self.assertEqual("urn:task-2", await create("Summarize briefly"))
+        self.assertEqual("urn:task-3", await create("Summarize", "http://other.test"))
+        self.assertEqual(
+            "urn:task-4", await create("Summarize", output_type=Suggestions)
+        )
+        self.assertEqual(4, len(seen))
+
+    def test_fingerprints_schemas_by_their_cached_digest(self) -> None:
+        schema = cached_schema(Suggestion)
+        request = CreateTaskRequest(
+            task_type=TaskNames.TRANSFORM, name="task", output_type=schema.schema
+        )
+        self.assertEqual(
+            request.fingerprint(), request.fingerprint(output_digest=schema.digest)
+        )
+        reordered = dict(reversed(list(schema.schema.items())))
+        self.assertEqual(
+            request.fingerprint(),
+            request.model_copy(update={"output_type": reordered}).fingerprint(),
+        )
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=1)
+        self.calls = 0
+
+    def submit(self, fn: Any, /, *args: Any, **kwargs: Any) -> "Future[Any]":
+        self.calls += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+class RecordingProcessPool(ProcessPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=1)
+        self.calls = 0
+
+    def submit(self, fn: Any, /, *args: Any, **kwargs: Any) -> "Future[Any]":
+        self.calls += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+class TestOutropyApiDecoding(unittest.IsolatedAsyncioTestCase):
+    def api(self, **kwargs: Any) -> OutropyApi:
+        items = [{"file": f"src/file_{i}.py"} for i in range(100)]
+        body = json.dumps({"items": items}).encode()
+        return OutropyApi(
+            "key",
+            "http://api.test",
+            transport=httpx.MockTransport(lambda _: httpx.Response(200, content=body)),
+            **kwargs,
+        )
+
+    async def test_decodes_inline_without_an_executor(self) -> None:
+        async with self.api(offload_threshold=1000) as api:
+            result = await api.download_object(Suggestions, "urn:a")
+        self.assertIsNone(api.decode_executor)
+        assert result is not None
+        self.assertEqual(Suggestion(file="src/file_7.py"), result.items[7])
+
+    async def test_offloads_large_responses_to_the_given_executor(self) -> None:
+        with RecordingExecutor() as executor:
+            async with self.api(
+                offload_threshold=2**20, decode_executor=executor
+            ) as api:
+                await api.download_object(Suggestions, "urn:a")
+                self.assertEqual(0, executor.calls)
+
+                api.offload_threshold = 1000
+                result = await api.download_object(Suggestions, "urn:b")
+                self.assertEqual(1, executor.calls)
+        assert result is not None
+        self.assertEqual(Suggestion(file="src/file_7.py"), result.items[7])
+
+    async def test_decodes_unpicklable_types_inline(self) -> None:
+        class Local(BaseModel):
+            items: List[Suggestion]
+
+        with RecordingProcessPool() as executor:
+            async with self.api(
+                offload_threshold=1000, decode_executor=executor
+            ) as api:
+                result = await api.download_object(Local, "urn:a")
+            self.assertEqual(0, executor.calls)
+        assert result is not None
+        self.assertEqual(100, len(result.items))
+
+
+class TestOutropyApiUploads(unittest.IsolatedAsyncioTestCase):
+    async def test_uploads_text_with_its_byte_size(self) -> None:
+        seen: List[httpx.Request] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await request.aread()
+            seen.append(request)
+            return httpx.Response(200, json={"urns": ["urn:uploaded"]})
+
+        async with OutropyApi(
+            "key", "http://api.test", transport=httpx.MockTransport(handler)
+        ) as api:
+            urn = await api.upload_text("notes.txt", "text/plain", "ação")
+
+        self.assertEqual("urn:uploaded", urn)
+        self.assertEqual("6", seen[0].headers[UPLOAD_FILE_SIZE_HEADER])
+        self.assertEqual("text/plain", seen[0].headers[UPLOAD_FILE_MIME_TYPE_HEADER])
+        self.assertEqual(int(seen[0].headers["Content-Length"]), len(seen[0].content))
+        self.assertIn("ação".encode(), seen[0].content)
+        self.assertNotIn("Transfer-Encoding", seen[0].headers)
+
+    async def test_retries_uploads_that_never_reached_the_server(self) -> None:
+        attempts: List[int] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(len(attempts))
+            if len(attempts) == 1:
+                raise httpx.ConnectError("refused", request=request)
+            if len(attempts) == 2:
+                return httpx.Response(503, text="busy")
+            return httpx.Response(200, json={"urns": ["urn:uploaded"]})
+
+        fast = Backoff(max_attempts=3, base_delay=0.001, max_delay=0.001)
+        async with OutropyApi(
+            "key",
+            "http://api.test",
+            transport=httpx.MockTransport(handler),
+            retry_policy=RetryPolicy(
+                status_backoffs={503: fast},
+                exception_backoffs={httpx.ConnectError: fast},
+                unsent_exceptions=(httpx.ConnectError,),
+            ),
+        ) as api:
+            with self.assertRaises(OutropyHttpError) as raised:
+                await api.upload_text("notes.txt", "text/plain", "hello")
+        self.assertEqual(503, raised.exception.status_code)
+        self.assertEqual(2, len(attempts))
+
+    async def test_reuses_earlier_identical_uploads(self) -> None:
+        uploads: List[str] = []
+        known_urns: Set[str] = set()
+        forbidden_urns: Set[str] = set()
+        broken_urns: Set[str] = set()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/metadata"):
+                urn = request.url.path.split("/")[-2]
+                if urn in broken_urns:
+                    return httpx.Response(500, text="boom")
+                if urn in forbidden_urns:
+                    return httpx.Response(403, text="forbidden")
+                if urn not in known_urns:
+                    return httpx.Response(404, text="not found")
+                return httpx.Response(
+                    200,
+                    json={
+                        "urn": urn,
+                        "file_name": "x",
+                        "mime_type": "text/plain",
+                        "size_bytes": 1,
+                        "metadata": {},
+                    },
+                )
+            uploads.append((await request.aread()).decode())
+            urn = f"urn:upload-{len(uploads)}"
+            known_urns.add(urn)
+            return httpx.Response(200, json={"urns": [urn]})
+
+        store = PersistentStore(":memory:")
+
+        def client(key: str) -> OutropyApi:
+            return OutropyApi(
+                key,
+                "http://api.test",
+                transport=httpx.MockTransport(handler),
+                state_store=store,
+            )
+
+        async with client("key") as api:
+            first = await api.upload_text("a.txt", "text/plain", "criteria")
+            again = await api.upload_text("b.txt", "text/plain", "criteria")
+            as_json = await api.upload_text("a.txt", "application/json", "criteria")
+            self.assertEqual(first, again)
+            self.assertNotEqual(first, as_json)
+            self.assertEqual(2, len(uploads))
+
+            known_urns.clear()
+            self.assertEqual(
+                "urn:upload-3", await api.upload_text("a.txt", "text/plain", "criteria")
+            )
+
+            forbidden_urns.add("urn:upload-3")
+            self.assertEqual(
+                "urn:upload-4", await api.upload_text("a.txt", "text/plain", "criteria")
+            )
+
+            # A probe that failed for any other reason is not taken as "gone"
+            broken_urns.add("urn:upload-4")
+            with self.assertRaises(OutropyHttpError) as raised:
+                await api.upload_text("a.txt", "text/plain", "criteria")
+            self.assertEqual(500, raised.exception.status_code)
+            self.assertEqual(4, len(uploads))
+
+        # Uploads of one account are never offered to another sharing the store
+        async with client("other-key") as other:
+            self.assertEqual(
+                "urn:upload-5",
+                await other.upload_text("a.txt", "text/plain", "criteria"),
+            )
+
+    async def test_packs_many_uploads_into_few_requests(self) -> None:
+        batches: List[List[str]] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            names = re.findall(r'filename="([^"]*)"', (await request.aread()).decode())
+            batches.append(names)
+            mime_type = request.headers[UPLOAD_FILE_MIME_TYPE_HEADER]
+            return httpx.Response(
+                200, json={"urns": [f"urn:{mime_type}:{name}" for name in names]}
+            )
+
+        uploads = [
+            ("text/plain", UploadSource.from_bytes(f"q{i}", b"x" * 10))
+            for i in range(5)
+        ]
+        uploads.insert(2, ("application/json", UploadSource.from_bytes("j", b"{}")))
+
+        async with OutropyApi(
+            "key", "http://api.test", transport=httpx.MockTransport(handler)
+        ) as api:
+            urns = await api.upload_many(uploads, max_batch_bytes=25)
+
+        self.assertEqual(
+            [f"urn:{mime}:{source.file_name}" for mime, source in uploads], urns
+        )
+        self.assertEqual([["q0", "q1"], ["q2", "q3"], ["q4"], ["j"]], batches)
+
+    async def test_caps_upload_requests_in_flight(self) -> None:
+        in_flight = 0
+        max_in_flight = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            if b'filename="q3"' in await request.aread():
+                return httpx.Response(500, text="boom")
+            return httpx.Response(200, json={"urns": ["urn:upload"]})
+
+        uploads = [
+            ("text/plain", UploadSource.from_bytes(f"q{i}", b"x")) for i in range(10)
+        ]
+        async with OutropyApi(
+            "key", "http://api.test", transport=httpx.MockTransport(handler)
+        ) as api:
+            self.assertEqual(
+                ["urn:upload"] * 3,
+                await api.upload_many(uploads[:3], max_batch_files=1, concurrency=2),
+            )
+            with self.assertRaises(OutropyHttpError):
+                await api.upload_many(uploads, max_batch_files=1, concurrency=2)
+        self.assertEqual(2, max_in_flight)
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: List[bytes]) -> None:
+        self.chunks = chunks
+        self.closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self.chunks:
+            yield chunk
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class TestOutropyApiDownloads(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.payload = b"0123456789" * 1000
+        self.tmp = tempfile.TemporaryDirectory()
+        self.requests = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests += 1
+            if request.url.path.endswith("missing"):
+                return httpx.Response(404, text="not found")
+            return httpx.Response(200, content=self.payload)
+
+        self.transport = httpx.MockTransport(handler)
+        self.api = OutropyApi(
+            "key", "http://api.test", transport=self.transport, spill_threshold=4096
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.api.aclose()
+        self.tmp.cleanup()
+
+    async def test_caches_immutable_results(self) -> None:
+        cache_dir = Path(self.tmp.name) / "cache"
+        async with OutropyApi(
+            "key",
+            "http://api.test",
+            transport=self.transport,
+            content_cache=ContentCache(disk_dir=cache_dir, compress=True),
+        ) as api:
+            self.assertEqual(self.payload.decode(), await api.download_text("urn:a"))
+            self.assertEqual(self.payload.decode(), await api.download_text("urn:a"))
+        self.assertEqual(1, self.requests)
+
+        async with OutropyApi(
+            "key",
+            "http://api.test",
+            transport=self.transport,
+            content_cache=ContentCache(disk_dir=cache_dir),
+        ) as api:
+            self.assertEqual(self.payload.decode(), await api.download_text("urn:a"))
+            self.assertEqual(1, api.content_cache.stats()["disk"].hits)
+        self.assertEqual(1, self.requests)
+
+    async def test_streams_in_chunks(self) -> None:
+        chunks = [c async for c in self.api.download_stream("urn:big", 1000)]
+        self.assertEqual(10, len(chunks))
+        self.assertEqual(self.payload, b"".join(chunks))
+
+    async def test_downloads_to_file(self) -> None:
+        target = Path(self.tmp.name) / "result.bin"
+        self.assertEqual(target, await self.api.download_to_file("urn:big", target))
+        self.assertEqual(self.payload, target.read_bytes())
+
+        with self.assertRaises(OutropyHttpError):
+            await self.api.download_to_file("urn:missing", target.with_name("x"))
+        self.assertEqual(["result.bin"], os.listdir(self.tmp.name))
+
+    async def test_spills_large_downloads_to_disk(self) -> None:
+        with await self.api.download_spooled("urn:big") as spooled:
+            self.assertTrue(spooled._rolled)  # type: ignore
+            self.assertEqual(self.payload, spooled.read())
+
+        with await self.api.download_spooled("urn:big", 1_000_000) as spooled:
+            self.assertFalse(spooled._rolled)  # type: ignore
+            self.assertEqual(self.payload, spooled.read())
+
+    async def test_yields_array_items_while_downloading(self) -> None:
+        self.payload = json.dumps(
+            {"overallSummary": "ok", "codeSuggestions": [{"file": "a"}, {"file": "b"}]}
+        ).encode()
+
+        items = [
+            item
+            async for item in self.api.download_array_items(
+                "urn:review", Suggestion, field="codeSuggestions"
+            )
+        ]
+
+        self.assertEqual([Suggestion(file="a"), Suggestion(file="b")], items)
+
+    async def test_closes_the_stream_once_the_array_ends(self) -> None:
+        stream = ChunkedStream(
+            [b'{"codeSuggestions": [{"file": "a"}]', b', "overallSummary": "ok"}']
+        )
+        api = OutropyApi(
+            "key",
+            "http://api.test",
+            transport=httpx.MockTransport(lambda _: httpx.Response(200, stream=stream)),
+        )
+        async with api:
+            items = [
+                item
+                async for item in api.download_array_items(
+                    "urn:review", Suggestion, field="codeSuggestions"
+                )
+            ]
+            self.assertTrue(stream.closed)
+        self.assertEqual([Suggestion(file="a")], items)
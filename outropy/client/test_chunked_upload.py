@@ -0,0 +1,162 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from outropy.client.api import OutropyApi
+from outropy.client.api_headers import UPLOAD_PART_OFFSET_HEADER
+from outropy.client.chunked_upload import ChunkedUploader
+from outropy.client.exceptions import OutropyHttpError
+from outropy.client.lanes import LaneConfig
+
+
+class ChunkedUploadServer:
+    """Stand-in for the server side of the chunked upload endpoints."""
+
+    def __init__(self) -> None:
+        self.uploads: Dict[str, Dict[int, tuple[int, bytes]]] = {}
+        self.completed: Dict[str, bytes] = {}
+        self.part_requests: List[tuple[str, int]] = []
+        self.fail_after_parts: Optional[int] = None
+        self.started = 0
+        self.complete_read_timeouts: List[float] = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/api/data/uploads/start":
+            self.started += 1
+            upload_id = f"upload-{self.started}"
+            self.uploads[upload_id] = {}
+            return httpx.Response(200, json={"upload_id": upload_id})
+
+        _, upload_id, action, *rest = path[len("/api/data/") :].split("/")
+        if upload_id not in self.uploads:
+            return httpx.Response(404, text="unknown upload")
+
+        if action == "parts":
+            if (
+                self.fail_after_parts is not None
+                and len(self.part_requests) >= self.fail_after_parts
+            ):
+                return httpx.Response(400, text="connection dropped")
+            offset = int(request.headers[UPLOAD_PART_OFFSET_HEADER])
+            self.part_requests.append((upload_id, offset))
+            self.uploads[upload_id][int(rest[0])] = (offset, await request.aread())
+            return httpx.Response(200, json={})
+
+        self.complete_read_timeouts.append(request.extensions["timeout"]["read"])
+        parts = json.loads(await request.aread())["parts"]
+        received = self.uploads[upload_id]
+        assembled = b"".join(
+            received[p["part_number"]][1]
+            for p in sorted(parts, key=lambda p: p["offset"])
+        )
+        self.completed[upload_id] = assembled
+        return httpx.Response(200, json={"urns": [f"urn:{upload_id}"]})
+
+
+class TestChunkedUploader(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file = Path(self.tmp.name) / "dataset.bin"
+        self.content = bytes(range(256)) * 4096  # 1 MiB
+        self.file.write_bytes(self.content)
+        self.server = ChunkedUploadServer()
+        self.api = OutropyApi(
+            "key", "http://api.test", transport=httpx.MockTransport(self.server.handle)
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.api.aclose()
+        self.tmp.cleanup()
+
+    def uploader(self) -> ChunkedUploader:
+        return ChunkedUploader(
+            self.api,
+            Path(self.tmp.name) / "manifests",
+            parallelism=3,
+            initial_part_size=100_000,
+            min_part_size=100_000,
+            max_part_size=100_000,
+        )
+
+    async def test_uploads_file_in_parallel_parts(self) -> None:
+        urn = await self.uploader().upload("application/octet-stream", self.file)
+
+        self.assertEqual("urn:upload-1", urn)
+        self.assertEqual(self.content, self.server.completed["upload-1"])
+        self.assertEqual(11, len(self.server.part_requests))
+        self.assertEqual([], list((Path(self.tmp.name) / "manifests").iterdir()))
+
+    async def test_completes_with_the_bulk_timeout(self) -> None:
+        await self.api.aclose()
+        self.api = OutropyApi(
+            "key",
+            "http://api.test",
+            transport=httpx.MockTransport(self.server.handle),
+            timeout=300,
+            control_lane=LaneConfig(read_timeout=5),
+        )
+        await self.uploader().upload("application/octet-stream", self.file)
+
+        self.assertEqual([300], self.server.complete_read_timeouts)
+
+    async def test_resumes_from_the_last_confirmed_part(self) -> None:
+        self.server.fail_after_parts = 4
+        with self.assertRaises(OutropyHttpError):
+            await self.uploader().upload("application/octet-stream", self.file)
+
+        self.server.fail_after_parts = None
+        urn = await self.uploader().upload("application/octet-stream", self.file)
+
+        self.assertEqual("urn:upload-1", urn)
+        self.assertEqual(self.content, self.server.completed["upload-1"])
+        sent_offsets = [offset for _, offset in self.server.part_requests]
+        self.assertEqual(len(sent_offsets), len(set(sent_offsets)))
+
+    async def test_leaves_only_the_manifest_behind(self) -> None:
+        self.server.fail_after_parts = 4
+        with self.assertRaises(OutropyHttpError):
+            await self.uploader().upload("application/octet-stream", self.file)
+
+        manifests = list((Path(self.tmp.name) / "manifests").iterdir())
+        self.assertEqual([".json"], [m.suffix for m in manifests])
+        self.assertFalse(manifests[0].name.startswith("."))
+
+    async def test_starts_over_when_the_file_changed(self) -> None:
+        self.server.fail_after_parts = 2
+        with self.assertRaises(OutropyHttpError):
+            await self.uploader().upload("application/octet-stream", self.file)
+
+        self.server.fail_after_parts = None
+        self.file.write_bytes(self.content[::-1])
+        await self.uploader().upload("application/octet-stream", self.file)
+
+        self.assertEqual(self.content[::-1], self.server.completed["upload-2"])
+
+    async def test_starts_over_when_the_server_forgot_the_upload(self) -> None:
+        self.server.fail_after_parts = 2
+        with self.assertRaises(OutropyHttpError):
+            await self.uploader().upload("application/octet-stream", self.file)
+
+        self.server.fail_after_parts = None
+        del self.server.uploads["upload-1"]
+        urn = await self.uploader().upload("application/octet-stream", self.file)
+
+        self.assertEqual("urn:upload-2", urn)
+        self.assertEqual(self.content, self.server.completed["upload-2"])
+
+    def test_adapts_part_size_to_bandwidth(self) -> None:
+        uploader = ChunkedUploader(
+            self.api,
+            min_part_size=1_000,
+            max_part_size=1_000_000,
+            target_part_seconds=2,
+        )
+        uploader._record_bandwidth(100_000, 1.0)
+        self.assertEqual(200_000, uploader.part_size)
+        uploader._record_bandwidth(10_000_000, 1.0)
+        self.assertEqual(1_000_000, uploader.part_size)
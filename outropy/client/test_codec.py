@@ -0,0 +1,56 @@
+import unittest
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from outropy.client.codec import adapter_for, decode, is_null
+
+
+class Dish(BaseModel):
+    name: str
+    calories: int
+
+
+class Menu(BaseModel):
+    dishes: List[Dish]
+    updated_at: datetime
+
+
+class TestDecode(unittest.TestCase):
+    def test_validates_lists_of_models(self) -> None:
+        dishes = decode(List[Dish], b'[{"name": "soup", "calories": "120"}]')
+        self.assertEqual([Dish(name="soup", calories=120)], dishes)
+
+    def test_rejects_invalid_payloads(self) -> None:
+        with self.assertRaises(ValidationError):
+            decode(Dish, b'{"name": "soup"}')
+
+    def test_decodes_null_as_none_for_optional_types(self) -> None:
+        self.assertIsNone(decode(Optional[Dish], b"null"))
+        self.assertIsNone(decode(Optional[Dish], b"null", trusted=True))
+
+    def test_trusted_mode_skips_validation(self) -> None:
+        dishes = decode(List[Dish], b'[{"name": "soup", "calories": "120"}]', True)
+        self.assertEqual("120", dishes[0].calories)
+
+        dish = decode(Optional[Dish], b'{"name": "soup"}', trusted=True)
+        self.assertIsInstance(dish, Dish)
+
+    def test_trusted_mode_still_validates_nested_models(self) -> None:
+        menu = decode(
+            Menu,
+            b'{"dishes": [{"name": "soup", "calories": 120}],'
+            b' "updated_at": "2024-05-01T12:00:00Z"}',
+            trusted=True,
+        )
+        self.assertEqual(Dish(name="soup", calories=120), menu.dishes[0])
+        self.assertIsInstance(menu.updated_at, datetime)
+
+    def test_reuses_adapters(self) -> None:
+        self.assertIs(adapter_for(List[Dish]), adapter_for(List[Dish]))
+
+    def test_spots_null_bodies(self) -> None:
+        self.assertTrue(is_null(b" null\n"))
+        self.assertFalse(is_null(b'"null"'))
+        self.assertFalse(is_null(b"[" + b"null," * 10 + b"null]"))
@@ -0,0 +1,79 @@
+import re
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+
+from outropy.client.multipart import MultipartBody, UploadSource
+
+
+async def read_body(body: MultipartBody) -> bytes:
+    return b"".join([chunk async for chunk in body])
+
+
+def parse_parts(body: MultipartBody, content: bytes) -> List[tuple[str, bytes]]:
+    delimiter = f"--{body.boundary}".encode()
+    *parts, closing = content.split(b"\r\n" + delimiter)
+    assert parts[0].startswith(delimiter + b"\r\n")
+    assert closing == b"--\r\n"
+    parsed = []
+    for part in parts:
+        headers, _, data = part.partition(b"\r\n\r\n")
+        file_name = re.search(rb'filename="([^"]*)"', headers).group(1)  # type: ignore
+        parsed.append((file_name.decode(), data))
+    return parsed
+
+
+class TestMultipartBody(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file = Path(self.tmp.name) / "big.bin"
+        self.file.write_bytes(bytes(range(256)) * 1000)
+
+    async def asyncTearDown(self) -> None:
+        self.tmp.cleanup()
+
+    async def test_streams_files_and_bytes_in_fixed_size_chunks(self) -> None:
+        body = MultipartBody(
+            [
+                UploadSource.from_path(self.file),
+                UploadSource.from_bytes('olá "mundo".txt', "olá mundo".encode()),
+            ],
+            chunk_size=1024,
+        )
+
+        chunks = [chunk async for chunk in body]
+        content = b"".join(chunks)
+
+        self.assertLessEqual(max(len(c) for c in chunks), 1024)
+        self.assertEqual(body.content_length, len(content))
+        self.assertEqual(
+            [
+                ("big.bin", self.file.read_bytes()),
+                ("olá %22mundo%22.txt", "olá mundo".encode()),
+            ],
+            parse_parts(body, content),
+        )
+
+    async def test_can_be_iterated_again(self) -> None:
+        body = MultipartBody([UploadSource.from_path(self.file)])
+        self.assertEqual(await read_body(body), await read_body(body))
+
+    async def test_handles_empty_payloads(self) -> None:
+        empty = Path(self.tmp.name) / "empty.txt"
+        empty.touch()
+        body = MultipartBody([UploadSource.from_path(empty)])
+        content = await read_body(body)
+        self.assertEqual(body.content_length, len(content))
+        self.assertEqual([("empty.txt", b"")], parse_parts(body, content))
+
+    def test_counts_bytes_not_characters(self) -> None:
+        self.assertEqual(5, UploadSource.from_bytes("x", "ção".encode()).size)
+        with self.assertRaises(ValueError):
+            UploadSource("x")
+
+    def test_digest_depends_on_content_only(self) -> None:
+        from_file = UploadSource.from_path(self.file)
+        in_memory = UploadSource.from_bytes("other.bin", self.file.read_bytes())
+        self.assertEqual(from_file.digest(b"text"), in_memory.digest(b"text"))
+        self.assertNotEqual(from_file.digest(), in_memory.digest(b"text"))
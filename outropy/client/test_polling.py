@@ -0,0 +1,53 @@
+import unittest
+
+from outropy.client.pipeline import TaskRunResponse
+from outropy.client.polling import PollingPolicy, RunDurationHistory
+from outropy.client.test_api import run_response
+
+
+class TestPollingPolicy(unittest.TestCase):
+    def test_backs_off_exponentially_up_to_the_cap(self) -> None:
+        policy = PollingPolicy(
+            initial_delay=0.5, growth_factor=2, max_delay=3, jitter=0
+        )
+        self.assertEqual(
+            [0.5, 1.0, 2.0, 3.0, 3.0], [policy.next_delay(a, 0) for a in range(5)]
+        )
+
+    def test_stays_capped_on_long_runs(self) -> None:
+        policy = PollingPolicy(jitter=0)
+        self.assertEqual(10.0, policy.next_delay(1024, 0))
+        self.assertEqual(10.0, policy.next_delay(10**6, 9, expected_duration=8))
+        self.assertEqual(
+            1.0, PollingPolicy(initial_delay=1, max_delay=1).backoff_delay(10**6)
+        )
+
+    def test_sleeps_until_the_expected_finish(self) -> None:
+        policy = PollingPolicy(initial_delay=0.5, max_delay=10, jitter=0)
+        self.assertEqual(6.0, policy.next_delay(0, elapsed=2, expected_duration=8))
+        self.assertEqual(10.0, policy.next_delay(0, elapsed=0, expected_duration=60))
+        self.assertEqual(0.5, policy.next_delay(0, elapsed=7.9, expected_duration=8))
+
+    def test_falls_back_to_backoff_when_overdue(self) -> None:
+        policy = PollingPolicy(initial_delay=0.5, growth_factor=2, jitter=0)
+        self.assertEqual(2.0, policy.next_delay(2, elapsed=9, expected_duration=8))
+
+    def test_jitter_stays_within_bounds(self) -> None:
+        policy = PollingPolicy(initial_delay=1, jitter=0.2)
+        for _ in range(100):
+            self.assertTrue(0.8 <= policy.next_delay(0, 0) <= 1.2)
+
+
+class TestRunDurationHistory(unittest.TestCase):
+    def test_tracks_moving_average_of_successful_runs(self) -> None:
+        history = RunDurationHistory(smoothing=0.5)
+        self.assertIsNone(history.expected_duration("urn:pipeline"))
+
+        run = TaskRunResponse.model_validate(run_response("run-1"))
+        history.record(run.model_copy(update={"duration": 4.0}))
+        history.record(run.model_copy(update={"duration": 8.0}))
+        history.record(
+            run.model_copy(update={"duration": 100.0, "status_str": "FAILED"})
+        )
+
+        self.assertEqual(6.0, history.expected_duration("urn:pipeline"))
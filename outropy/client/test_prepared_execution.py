@@ -0,0 +1,45 @@
+import unittest
+from typing import List
+
+import httpx
+
+from outropy.client.api import OutropyApi, PreparedExecution
+from outropy.client.directives import Directives
+from outropy.client.requests import ExecuteTaskRequest
+from outropy.copypasta.json.json import dumpb
+
+
+class TestPreparedExecution(unittest.IsolatedAsyncioTestCase):
+    async def test_sends_the_same_body_as_execute_task(self) -> None:
+        seen: List[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(200, json={"urn": "urn:run", "href": "href"})
+
+        directives = Directives(latency=10, accuracy=90)
+        async with OutropyApi(
+            "key", "http://api.test", transport=httpx.MockTransport(handler)
+        ) as api:
+            prepared = api.prepare_execution("urn:task", directives, ["urn:ref"])
+            response = await prepared.execute(["urn:a", 'urn:"b"'])
+            await api.execute_task(
+                "urn:task",
+                subject=["urn:a", 'urn:"b"'],
+                directives=directives,
+                reference_data=["urn:ref"],
+            )
+
+        self.assertEqual("urn:run", response.urn)
+        self.assertEqual(seen[1].content, seen[0].content)
+        self.assertEqual(seen[1].url, seen[0].url)
+        self.assertEqual("application/json", seen[0].headers["Content-Type"])
+
+    def test_only_serializes_the_subjects(self) -> None:
+        api = OutropyApi("key", "http://api.test")
+        prepared = api.prepare_execution("urn:task")
+        self.assertIsInstance(prepared, PreparedExecution)
+        expected = ExecuteTaskRequest(
+            task_urn="urn:task", subject_urns=["urn:x"], reference_data=[]
+        )
+        self.assertEqual(dumpb(expected), prepared.body(["urn:x"]))
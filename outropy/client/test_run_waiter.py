@@ -0,0 +1,118 @@
+import asyncio
+import unittest
+from collections import Counter
+from typing import Optional
+
+import httpx
+
+from outropy.client.api import OutropyApi
+from outropy.client.polling import PollingPolicy
+from outropy.client.run_waiter import RunWaiter
+from outropy.client.test_api import run_response
+from outropy.copypasta.cache.content_cache import ContentCache
+
+
+class BrokenPolicy(PollingPolicy):
+    def next_delay(
+        self, attempt: int, elapsed: float, expected_duration: Optional[float] = None
+    ) -> float:
+        raise OverflowError()
+
+
+class TestRunWaiter(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        # How many polls each run needs before it reports as finished
+        self.polls_until_done = {"run-fast": 1, "run-slow": 4, "run-failed": 2}
+        self.requests: Counter[str] = Counter()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            path = request.url.path
+            self.requests[path] += 1
+            if path.startswith("/api/data/"):
+                return httpx.Response(
+                    200, text=f"results of {path[len('/api/data/'):]}"
+                )
+            run_id = path.rsplit("/", 1)[-1]
+            if run_id == "run-broken":
+                return httpx.Response(500, text="boom")
+            done = self.requests[path] >= self.polls_until_done[run_id]
+            status = "FAILED" if run_id == "run-failed" else "COMPLETED"
+            return httpx.Response(
+                200, json=run_response(run_id, status if done else "RUNNING")
+            )
+
+        self.api = OutropyApi(
+            "key", "http://api.test", transport=httpx.MockTransport(handler)
+        )
+        self.waiter = RunWaiter(
+            self.api, PollingPolicy(initial_delay=0.001, max_delay=0.005, jitter=0)
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.waiter.aclose()
+        await self.api.aclose()
+
+    async def test_wait_all_returns_runs_in_order(self) -> None:
+        runs = await self.waiter.wait_all(["run-slow", "run-fast", "run-failed"])
+        self.assertEqual(["run-slow", "run-fast", "run-failed"], [r.urn for r in runs])
+        self.assertEqual(4, self.requests["/api/pipelines/runs/run-slow"])
+        self.assertEqual(1, self.requests["/api/pipelines/runs/run-fast"])
+        self.assertTrue(runs[2].status.is_failed)
+
+    async def test_wait_any_returns_first_to_finish(self) -> None:
+        run = await self.waiter.wait_any(["run-slow", "run-fast"])
+        self.assertEqual("run-fast", run.urn)
+
+    async def test_as_completed_yields_in_finish_order(self) -> None:
+        finished = [
+            run.urn
+            async for run in self.waiter.as_completed(
+                ["run-slow", "run-failed", "run-fast"]
+            )
+        ]
+        self.assertEqual(["run-fast", "run-failed", "run-slow"], finished)
+
+    async def test_prefetches_results_of_finished_runs(self) -> None:
+        run = await self.waiter.wait_any(["run-fast"])
+        self.assertEqual("results of run-fast-results", await self.waiter.results(run))
+        self.assertEqual(1, self.requests["/api/data/run-fast-results"])
+
+    async def test_holds_finished_downloads_until_asked(self) -> None:
+        # Results too big for the content cache are still only downloaded once
+        self.api.content_cache = ContentCache(memory_bytes=0)
+        runs = await self.waiter.wait_all(["run-fast", "run-slow"])
+        await asyncio.sleep(0.01)
+        self.assertEqual({"run-fast", "run-slow"}, set(self.waiter._downloads))
+
+        for run in runs:
+            self.assertEqual(
+                f"results of {run.urn}-results", await self.waiter.results(run)
+            )
+            self.assertEqual(1, self.requests[f"/api/data/{run.urn}-results"])
+        self.assertEqual({}, self.waiter._downloads)
+
+    async def test_drops_the_oldest_finished_downloads(self) -> None:
+        self.api.content_cache = ContentCache(memory_bytes=0)
+        self.waiter.max_prefetched_results = 1
+        fast, slow = await self.waiter.wait_all(["run-fast", "run-slow"])
+        await asyncio.sleep(0.01)
+        self.assertEqual(["run-slow"], list(self.waiter._downloads))
+
+        await self.waiter.results(fast)
+        self.assertEqual(2, self.requests["/api/data/run-fast-results"])
+
+    async def test_tracking_the_same_run_twice_shares_the_poller(self) -> None:
+        await self.waiter.wait_all(["run-slow", "run-slow"])
+        self.assertEqual(4, self.requests["/api/pipelines/runs/run-slow"])
+
+    async def test_poll_errors_fail_only_that_run(self) -> None:
+        with self.assertRaises(Exception):
+            await self.waiter.wait_all(["run-broken"])
+        run = await self.waiter.wait_any(["run-fast"])
+        self.assertEqual("run-fast", run.urn)
+
+    async def test_scheduling_errors_fail_the_run(self) -> None:
+        self.waiter.policy = BrokenPolicy()
+        with self.assertRaises(OverflowError):
+            await asyncio.wait_for(self.waiter.wait_all(["run-slow"]), 1)
+        self.assertEqual({}, self.waiter._tracked)
@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+__all__ = ["CacheStats", "MemoryCache", "DiskCache", "ContentCache"]
+
+# First byte of every object on disk
+_RAW = b"r"
+_COMPRESSED = b"z"
+# Eviction frees up this much of the budget, so it doesn't rescan on every put
+_EVICT_TO = 0.9
+
+
+class CacheStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self.bytes,
+            "hit_ratio": self.hit_ratio,
+        }
+
+    def __repr__(self) -> str:
+        return f"CacheStats({self.as_dict()})"
+
+
+class MemoryCache:
+    """LRU of byte strings, bounded by their total size rather than their count."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = self._entries.get(key)
+        if data is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            # Caching it would flush everything else for a single entry
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.stats.bytes -= len(previous)
+        self._entries[key] = data
+        self.stats.bytes += len(data)
+        while self.stats.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.stats.bytes -= len(evicted)
+            self.stats.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """Content-addressed store on disk, with a small index file per key.
+
+    Identical content stored under different keys is kept once. Objects are read
+    through a memory mapping and can be compressed with zlib. Once the objects take
+    more than `max_bytes`, the least recently stored or read ones are removed.
+    """
+
+    def __init__(
+        self, root: Path, compress: bool = False, max_bytes: int = 1024**3
+    ) -> None:
+        self.root = root
+        self.compress = compress
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        # Size of the objects on disk, measured the first time something is stored.
+        # Other processes sharing the directory are accounted for on every eviction
+        self._measured = False
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        key_path = self._key_path(key)
+        try:
+            object_path = self._object_path(key_path.read_text())
+            data = self._read_object(object_path)
+        except FileNotFoundError:
+            # The object may have been evicted, which leaves its key dangling
+            key_path.unlink(missing_ok=True)
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        _touch(object_path)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+        if not _touch(object_path):
+            stored = _COMPRESSED + zlib.compress(data) if self.compress else _RAW + data
+            if len(stored) > self.max_bytes:
+                return
+            _write_atomically(object_path, stored)
+            with self._lock:
+                if self._measured:
+                    self.stats.bytes += len(stored)
+                else:
+                    self.stats.bytes = sum(size for _, size, _ in self._objects())
+                    self._measured = True
+                if self.stats.bytes > self.max_bytes:
+                    self._evict()
+        _write_atomically(self._key_path(key), digest.encode())
+
+    def _evict(self) -> None:
+        objects = sorted(self._objects())
+        total = sum(size for _, size, _ in objects)
+        for _, size, path in objects:
+            if total <= self.max_bytes * _EVICT_TO:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.stats.evictions += 1
+        self.stats.bytes = total
+
+    def _objects(self) -> List[Tuple[float, int, Path]]:
+        objects = []
+        for path in (self.root / "objects").glob("*/*"):
+            if path.name.endswith(".tmp"):
+                # Still being written
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            objects.append((stat.st_mtime, stat.st_size, path))
+        return objects
+
+    def _read_object(self, path: Path) -> bytes:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # Compression is recorded per object, so a store can be switched
+                # either way without being wiped
+                if mapped[:1] == _COMPRESSED:
+                    with memoryview(mapped) as view, view[1:] as compressed:
+                        return zlib.decompress(compressed)
+                return mapped[1:]
+
+    def _key_path(self, key: str) -> Path:
+        return self.root / "keys" / hashlib.sha256(key.encode()).hexdigest()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest[2:]
+
+
+class ContentCache:
+    """Two-tier cache for immutable content: memory first, then optionally disk.
+
+    Disk hits are promoted to memory, so repeated reads stay off the filesystem.
+    From async code use `aget` and `aput`, which go to disk in a worker thread.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[Path] = None,
+        compress: bool = False,
+        disk_bytes: int = 1024**3,
+    ) -> None:
+        self.memory = MemoryCache(memory_bytes)
+        self.disk = (
+            DiskCache(disk_dir, compress, disk_bytes) if disk_dir is not None else None
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = self.memory.get(key)
+        if data is None and self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                self.memory.put(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        self.memory.put(key, data)
+        if self.disk is not None:
+            self.disk.put(key, data)
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        data = self.memory.get(key)
+        if data is None and self.disk is not None:
+            data = await asyncio.to_thread(self.disk.get, key)
+            if data is not None:
+                self.memory.put(key, data)
+        return data
+
+    async def aput(self, key: str, data: bytes) -> None:
+        self.memory.put(key, data)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put, key, data)
+
+    def stats(self) -> Dict[str, CacheStats]:
+        stats = {"memory": self.memory.stats}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats
+        return stats
+
+
+def _touch(path: Path) -> bool:
+    # Marks it as recently used, which keeps it from being evicted
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A temporary file of our own, so concurrent writers of the same path never
+    # replace it with each other's half-written one
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
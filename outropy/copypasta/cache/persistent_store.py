@@ -0,0 +1,143 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+__all__ = ["PersistentStore"]
+
+
+class PersistentStore:
+    """Small key-value store in a local SQLite file, for state that outlives a process.
+
+    Keys live in namespaces so unrelated features can share one file. Entries can
+    expire, and a namespace can be trimmed to a size, least recently read first.
+    From async code use the `a`-prefixed methods, which run in a worker thread.
+    """
+
+    def __init__(
+        self, path: Path | str, clock: Callable[[], float] = time.time
+    ) -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.clock = clock
+        # Autocommit, every write is durable on its own. The connection is shared
+        # with worker threads, one statement sequence at a time
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._get(namespace, key)
+
+    def _get(self, namespace: str, key: str) -> Optional[bytes]:
+        now = self.clock()
+        row = self._db.execute(
+            "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            self.delete(namespace, key)
+            return None
+        self._db.execute(
+            "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+            (now, namespace, key),
+        )
+        return bytes(value)
+
+    def put(
+        self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None
+    ) -> None:
+        now = self.clock()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries"
+                " (namespace, key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    namespace,
+                    key,
+                    value,
+                    len(value),
+                    None if ttl is None else now + ttl,
+                    now,
+                ),
+            )
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+
+    def size(self, namespace: str) -> int:
+        with self._lock:
+            (total,) = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?",
+                (namespace,),
+            ).fetchone()
+        return int(total)
+
+    def evict(self, namespace: str, max_bytes: int) -> int:
+        """Drops expired entries, then the least recently read until under `max_bytes`.
+
+        Returns how many entries were dropped.
+        """
+        with self._lock:
+            return self._evict(namespace, max_bytes)
+
+    def _evict(self, namespace: str, max_bytes: int) -> int:
+        dropped = self._db.execute(
+            "DELETE FROM entries WHERE namespace = ? AND expires_at <= ?",
+            (namespace, self.clock()),
+        ).rowcount
+        excess = self.size(namespace) - max_bytes
+        if excess <= 0:
+            return dropped
+        rows = self._db.execute(
+            "SELECT key, size FROM entries WHERE namespace = ? ORDER BY accessed_at",
+            (namespace,),
+        )
+        victims = []
+        for key, size in rows:
+            if excess <= 0:
+                break
+            victims.append((namespace, key))
+            excess -= size
+        self._db.executemany(
+            "DELETE FROM entries WHERE namespace = ? AND key = ?", victims
+        )
+        return dropped + len(victims)
+
+    async def aget(self, namespace: str, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self.get, namespace, key)
+
+    async def aput(
+        self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None
+    ) -> None:
+        await asyncio.to_thread(self.put, namespace, key, value, ttl)
+
+    async def adelete(self, namespace: str, key: str) -> None:
+        await asyncio.to_thread(self.delete, namespace, key)
+
+    async def aevict(self, namespace: str, max_bytes: int) -> int:
+        return await asyncio.to_thread(self.evict, namespace, max_bytes)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from outropy.copypasta.cache.content_cache import (
+    ContentCache,
+    DiskCache,
+    MemoryCache,
+    _write_atomically,
+)
+
+
+class TestMemoryCache(unittest.TestCase):
+    def test_evicts_least_recently_used_past_the_byte_budget(self) -> None:
+        cache = MemoryCache(max_bytes=10)
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        cache.get("a")
+        cache.put("c", b"cccc")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(b"aaaa", cache.get("a"))
+        self.assertEqual(1, cache.stats.evictions)
+        self.assertEqual(8, cache.stats.bytes)
+
+    def test_skips_entries_larger_than_the_budget(self) -> None:
+        cache = MemoryCache(max_bytes=10)
+        cache.put("a", b"aaaa")
+        cache.put("big", b"x" * 11)
+        self.assertEqual(1, len(cache))
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_round_trips_with_and_without_compression(self) -> None:
+        for compress in (False, True):
+            cache = DiskCache(self.root / str(compress), compress)
+            cache.put("urn:a", b"result " * 100)
+            cache.put("urn:empty", b"")
+            self.assertEqual(b"result " * 100, DiskCache(cache.root).get("urn:a"))
+            self.assertEqual(b"", cache.get("urn:empty"))
+            self.assertIsNone(cache.get("urn:missing"))
+            self.assertEqual(1, cache.stats.hits)
+            self.assertEqual(1, cache.stats.misses)
+
+    def test_stores_identical_content_once(self) -> None:
+        cache = DiskCache(self.root)
+        cache.put("urn:a", b"same")
+        cache.put("urn:b", b"same")
+        objects = [p for p in (self.root / "objects").rglob("*") if p.is_file()]
+        self.assertEqual(1, len(objects))
+        self.assertEqual(b"same", cache.get("urn:b"))
+
+    def test_evicts_least_recently_used_past_the_byte_budget(self) -> None:
+        cache = DiskCache(self.root, max_bytes=25)
+        cache.put("urn:a", b"a" * 10)
+        cache.put("urn:b", b"b" * 10)
+        for n, data in enumerate([b"a" * 10, b"b" * 10]):
+            path = cache._object_path(hashlib.sha256(data).hexdigest())
+            os.utime(path, (n, n))
+        cache.get("urn:a")
+        cache.put("urn:c", b"c" * 10)
+
+        self.assertIsNone(cache.get("urn:b"))
+        self.assertEqual(b"a" * 10, cache.get("urn:a"))
+        self.assertEqual(b"c" * 10, cache.get("urn:c"))
+        self.assertEqual(1, cache.stats.evictions)
+        self.assertEqual(22, cache.stats.bytes)
+
+    def test_counts_what_other_processes_stored(self) -> None:
+        DiskCache(self.root).put("urn:a", b"a" * 10)
+        cache = DiskCache(self.root, max_bytes=15)
+        cache.put("urn:b", b"b" * 10)
+        self.assertEqual(1, cache.stats.evictions)
+        self.assertIsNone(cache.get("urn:a"))
+
+    def test_concurrent_writers_never_share_a_temporary_file(self) -> None:
+        path = self.root / "object"
+        contents = [bytes([n]) * 100_000 for n in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for _ in range(20):
+                list(pool.map(lambda data: _write_atomically(path, data), contents))
+        self.assertIn(path.read_bytes(), contents)
+        self.assertEqual([path], list(self.root.iterdir()))
+
+
+class TestContentCache(unittest.TestCase):
+    def test_promotes_disk_hits_to_memory(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            ContentCache(disk_dir=Path(tmp)).put("urn:a", b"result")
+
+            cache = ContentCache(disk_dir=Path(tmp))
+            self.assertEqual(b"result", cache.get("urn:a"))
+            self.assertEqual(b"result", cache.get("urn:a"))
+
+        stats = cache.stats()
+        self.assertEqual(1, stats["disk"].hits)
+        self.assertEqual(1, stats["memory"].hits)
+        self.assertEqual(1, stats["memory"].misses)
+
+    def test_reads_and_writes_from_async_code(self) -> None:
+        async def round_trip(cache: ContentCache) -> None:
+            await cache.aput("urn:a", b"result")
+            self.assertEqual(b"result", await cache.aget("urn:a"))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(round_trip(ContentCache(disk_dir=Path(tmp))))
+            cache = ContentCache(disk_dir=Path(tmp))
+            self.assertEqual(b"result", asyncio.run(cache.aget("urn:a")))
+            self.assertIsNone(asyncio.run(cache.aget("urn:missing")))
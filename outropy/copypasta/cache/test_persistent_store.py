@@ -0,0 +1,67 @@
+import asyncio
+import itertools
+import tempfile
+import unittest
+from pathlib import Path
+
+from outropy.copypasta.cache.persistent_store import PersistentStore
+
+
+class TestPersistentStore(unittest.TestCase):
+    def test_survives_reopening(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "state" / "store.db"
+            store = PersistentStore(path)
+            store.put("uploads", "a", b"urn:1")
+            store.put("uploads", "a", b"urn:2")
+            store.put("tasks", "a", b"urn:task")
+            store.close()
+
+            store = PersistentStore(path)
+            self.assertEqual(b"urn:2", store.get("uploads", "a"))
+            self.assertEqual(b"urn:task", store.get("tasks", "a"))
+
+            store.delete("uploads", "a")
+            self.assertIsNone(store.get("uploads", "a"))
+            store.close()
+
+    def test_expires_entries(self) -> None:
+        now = [1000.0]
+        store = PersistentStore(":memory:", clock=lambda: now[0])
+        store.put("results", "a", b"value", ttl=10)
+        store.put("results", "b", b"value")
+
+        now[0] += 11
+        self.assertIsNone(store.get("results", "a"))
+        self.assertEqual(b"value", store.get("results", "b"))
+
+    def test_evicts_least_recently_read_past_the_size(self) -> None:
+        now = [1000.0]
+        store = PersistentStore(":memory:", clock=lambda: now[0])
+        for key in "abc":
+            now[0] += 1
+            store.put("results", key, b"12345")
+        store.put("tasks", "x", b"12345")
+        now[0] += 1
+        store.get("results", "a")
+
+        self.assertEqual(1, store.evict("results", max_bytes=10))
+        self.assertIsNone(store.get("results", "b"))
+        self.assertEqual(10, store.size("results"))
+        self.assertEqual(b"12345", store.get("tasks", "x"))
+
+    def test_serves_async_callers_from_worker_threads(self) -> None:
+        ticks = itertools.count()
+        store = PersistentStore(":memory:", clock=lambda: float(next(ticks)))
+
+        async def round_trip() -> None:
+            await asyncio.gather(
+                *(store.aput("results", str(n), b"12345") for n in range(20))
+            )
+            self.assertEqual(b"12345", await store.aget("results", "7"))
+            self.assertEqual(15, await store.aevict("results", max_bytes=25))
+            # Read last, so it survived the eviction
+            await store.adelete("results", "7")
+
+        asyncio.run(round_trip())
+        self.assertEqual(20, store.size("results"))
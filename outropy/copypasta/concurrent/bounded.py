@@ -0,0 +1,102 @@
+import asyncio
+from typing import (
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+__all__ = ["ItemResult", "bounded_map"]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class ItemResult(Generic[T, R]):
+    """Outcome of one item of a batch: either its value or the error it raised."""
+
+    def __init__(
+        self,
+        index: int,
+        item: T,
+        value: Optional[R] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        self.index = index
+        self.item = item
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> R:
+        if self.error is not None:
+            raise self.error
+        return self.value  # type: ignore
+
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error else f"value={self.value!r}"
+        return f"ItemResult(index={self.index}, item={self.item!r}, {outcome})"
+
+
+async def bounded_map(
+    fn: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    concurrency: int,
+    ordered: bool = False,
+) -> AsyncGenerator[ItemResult[T, R], None]:
+    """Applies `fn` to every item with at most `concurrency` calls in flight.
+
+    Items are pulled from `items` lazily and new calls are only started while the
+    consumer keeps iterating, so a slow consumer slows down the producer instead of
+    piling up results. Failures are reported per item and never abort the batch.
+    With `ordered` results come back in input order, otherwise as they complete.
+    """
+    if concurrency <= 0:
+        raise ValueError(f"Concurrency must be greater than 0, got [{concurrency}]")
+
+    async def run(index: int, item: T) -> ItemResult[T, R]:
+        try:
+            return ItemResult(index, item, value=await fn(item))
+        except Exception as e:
+            return ItemResult(index, item, error=e)
+
+    pending = iter(enumerate(items))
+    in_flight: Dict[int, "asyncio.Task[ItemResult[T, R]]"] = {}
+    next_to_yield = 0
+
+    def fill() -> None:
+        while len(in_flight) < concurrency:
+            nxt = next(pending, None)
+            if nxt is None:
+                return
+            in_flight[nxt[0]] = asyncio.create_task(run(*nxt))
+
+    try:
+        fill()
+        while in_flight:
+            if ordered:
+                result = await in_flight.pop(next_to_yield)
+                next_to_yield += 1
+                fill()
+                yield result
+            else:
+                done: Set["asyncio.Task[ItemResult[T, R]]"]
+                done, _ = await asyncio.wait(
+                    in_flight.values(), return_when=asyncio.FIRST_COMPLETED
+                )
+                finished = sorted(t.result().index for t in done)
+                results = [in_flight.pop(i).result() for i in finished]
+                fill()
+                for result in results:
+                    yield result
+    finally:
+        for task in in_flight.values():
+            task.cancel()
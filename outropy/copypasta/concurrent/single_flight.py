@@ -0,0 +1,39 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+__all__ = ["SingleFlight"]
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[K, T]):
+    """Coalesces concurrent calls for the same key into one.
+
+    The first caller for a key starts the call, everyone arriving while it is in
+    flight awaits the same result or error. Cancelling one caller doesn't cancel the
+    call for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[K, asyncio.Task[T]] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: K, task: "asyncio.Task[T]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+from typing import List
+
+from outropy.copypasta.concurrent.bounded import bounded_map
+
+
+class TestBoundedMap(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started: List[int] = []
+
+    async def slow_square(self, n: int) -> int:
+        self.started.append(n)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Bigger numbers finish first
+            await asyncio.sleep(0.001 * (10 - n))
+            if n == 3:
+                raise ValueError("three is not allowed")
+            return n * n
+        finally:
+            self.in_flight -= 1
+
+    async def test_ordered_results_keep_input_order(self) -> None:
+        results = [r async for r in bounded_map(self.slow_square, range(8), 3, True)]
+
+        self.assertEqual(list(range(8)), [r.index for r in results])
+        self.assertEqual([0, 1, 4, None, 16, 25, 36, 49], [r.value for r in results])
+        self.assertLessEqual(self.max_in_flight, 3)
+
+    async def test_unordered_results_come_as_completed(self) -> None:
+        # Items finish in value order, each once the one before it has been seen
+        released = [asyncio.Event() for _ in range(5)]
+
+        async def sleep_for(n: int) -> int:
+            await released[n].wait()
+            return n
+
+        released[0].set()
+        results = []
+        async for r in bounded_map(sleep_for, [3, 0, 2, 1], 4):
+            results.append(r)
+            released[r.item + 1].set()
+
+        self.assertEqual([0, 1, 2, 3], [r.value for r in results])
+        self.assertEqual([1, 3, 2, 0], [r.index for r in results])
+
+    async def test_failures_are_reported_per_item(self) -> None:
+        results = [r async for r in bounded_map(self.slow_square, range(5), 2, True)]
+
+        failed = [r for r in results if not r.ok]
+        self.assertEqual([3], [r.item for r in failed])
+        self.assertIsInstance(failed[0].error, ValueError)
+        with self.assertRaises(ValueError):
+            failed[0].unwrap()
+        self.assertEqual(16, results[4].unwrap())
+
+    async def test_does_not_run_ahead_of_the_consumer(self) -> None:
+        results = bounded_map(self.slow_square, range(100), 2, True)
+        await results.__anext__()
+        await results.aclose()
+
+        self.assertLessEqual(len(self.started), 3)
+
+    async def test_rejects_non_positive_concurrency(self) -> None:
+        with self.assertRaises(ValueError):
+            await bounded_map(self.slow_square, [1], 0).__anext__()
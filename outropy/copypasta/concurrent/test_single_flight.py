@@ -0,0 +1,51 @@
+import asyncio
+import unittest
+
+from outropy.copypasta.concurrent.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_coalesces_concurrent_calls(self) -> None:
+        flight: SingleFlight[str, int] = SingleFlight()
+        started = 0
+
+        async def fetch() -> int:
+            nonlocal started
+            started += 1
+            await asyncio.sleep(0.01)
+            return started
+
+        results = await asyncio.gather(*[flight.do("a", fetch) for _ in range(10)])
+
+        self.assertEqual([1] * 10, results)
+        self.assertEqual(1, flight.calls)
+        self.assertEqual(9, flight.shared)
+        self.assertEqual(0, flight.in_flight())
+        self.assertEqual(2, await flight.do("a", fetch))
+
+    async def test_shares_errors(self) -> None:
+        flight: SingleFlight[str, int] = SingleFlight()
+
+        async def fail() -> int:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flight.do("a", fail), flight.do("a", fail), return_exceptions=True
+        )
+        self.assertEqual(2, sum(isinstance(r, ValueError) for r in results))
+
+    async def test_cancelling_a_caller_keeps_the_call_going(self) -> None:
+        flight: SingleFlight[str, str] = SingleFlight()
+
+        async def fetch() -> str:
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(flight.do("a", fetch))
+        second = asyncio.create_task(flight.do("a", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        self.assertEqual("done", await second)
+        self.assertTrue(first.cancelled())
@@ -0,0 +1,136 @@
+import re
+from typing import List, Optional
+
+from jiter import from_json
+
+__all__ = ["ArrayItemReader"]
+
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_STRUCTURAL = re.compile(rb'["\[\]{},]')
+_WHITESPACE = b" \t\r\n"
+
+
+class ArrayItemReader:
+    """Splits one JSON array out of a document as its bytes arrive.
+
+    `feed` returns the raw bytes of every element completed by the chunk, so each
+    element can be parsed or validated on its own as soon as it is whole. The array is
+    either the document itself or, with `field`, the value of that key in the top
+    level object, e.g. `codeSuggestions`. Only the element being read is buffered.
+    """
+
+    def __init__(self, field: Optional[str] = None) -> None:
+        self.field = field
+        # Depth of the elements of the array we are after
+        self._array_depth = 1 if field is None else 2
+        self._buffer = bytearray()
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._string_start = 0
+        self._expect_key = False
+        self._last_key: Optional[str] = None
+        self._element_start: Optional[int] = None
+        self._in_array = False
+        self.finished = False
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        if self.finished:
+            return []
+        self._buffer += chunk
+        elements: List[bytes] = []
+        while not self.finished:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(self._buffer, self._pos)
+                if match is None:
+                    self._pos = len(self._buffer)
+                    break
+                pos = match.start()
+                if self._buffer[pos] == ord("\\"):
+                    if pos + 1 >= len(self._buffer):
+                        # Wait for the escaped character
+                        self._pos = pos
+                        break
+                    self._pos = pos + 2
+                    continue
+                self._in_string = False
+                self._pos = pos + 1
+                self._end_string()
+                continue
+
+            match = _STRUCTURAL.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+                break
+            pos = match.start()
+            self._pos = pos + 1
+            self._structural(self._buffer[pos], pos, elements)
+
+        self._compact()
+        return elements
+
+    def close(self) -> None:
+        if not self.finished:
+            raise ValueError("Incomplete JSON document, the array never ended")
+
+    def _structural(self, char: int, pos: int, elements: List[bytes]) -> None:
+        if char == ord('"'):
+            self._in_string = True
+            self._string_start = pos
+        elif char in b"[{":
+            if (
+                char == ord("[")
+                and not self._in_array
+                and self._depth == self._array_depth - 1
+                and (self.field is None or self._last_key == self.field)
+            ):
+                self._in_array = True
+                self._element_start = pos + 1
+            self._depth += 1
+            if char == ord("{") and self._depth == 1:
+                self._expect_key = True
+        elif char in b"]}":
+            if self._in_array and self._depth == self._array_depth:
+                self._emit(pos, elements)
+                self._in_array = False
+                self._element_start = None
+                self.finished = True
+            self._depth -= 1
+            if self._depth == 0 and not self.finished:
+                raise ValueError(f"No array found for field [{self.field}]")
+        elif char == ord(","):
+            if self._in_array and self._depth == self._array_depth:
+                self._emit(pos, elements)
+                self._element_start = pos + 1
+            elif self._depth == 1:
+                self._expect_key = True
+
+    def _end_string(self) -> None:
+        if self.field is not None and self._depth == 1 and self._expect_key:
+            self._last_key = from_json(
+                bytes(self._buffer[self._string_start : self._pos])  # noqa: E203
+            )
+            self._expect_key = False
+
+    def _emit(self, end: int, elements: List[bytes]) -> None:
+        assert self._element_start is not None
+        element = bytes(self._buffer[self._element_start : end]).strip(  # noqa: E203
+            _WHITESPACE
+        )
+        if element:
+            elements.append(element)
+
+    def _compact(self) -> None:
+        # Drop what has been consumed, keeping only the element being read
+        keep_from = self._pos
+        if self._in_string:
+            keep_from = min(keep_from, self._string_start)
+        if self._element_start is not None:
+            keep_from = min(keep_from, self._element_start)
+        if keep_from == 0:
+            return
+        del self._buffer[:keep_from]
+        self._pos -= keep_from
+        self._string_start -= keep_from
+        if self._element_start is not None:
+            self._element_start -= keep_from
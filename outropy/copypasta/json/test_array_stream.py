@@ -0,0 +1,57 @@
+import json
+import unittest
+from typing import Any, List, Optional
+
+from outropy.copypasta.json.array_stream import ArrayItemReader
+
+DOCUMENT = json.dumps(
+    {
+        "overallSummary": "codeSuggestions [are] {below}",
+        "examples": {"codeSuggestions": [0]},
+        "codeSuggestions": [
+            {"relevantFile": "a.py", "suggestion": 'quote \\" and ] inside'},
+            {"relevantFile": "b.py", "lines": [1, 2, {"x": []}]},
+            "plain",
+            42,
+        ],
+        "trailing": [1],
+    }
+).encode()
+
+
+def read(document: bytes, chunk_size: int, field: Optional[str] = None) -> List[Any]:
+    reader = ArrayItemReader(field)
+    items = []
+    for offset in range(0, len(document), chunk_size):
+        chunk = document[offset : offset + chunk_size]  # noqa: E203
+        items += [json.loads(element) for element in reader.feed(chunk)]
+    reader.close()
+    return items
+
+
+class TestArrayItemReader(unittest.TestCase):
+    def test_reads_the_array_under_a_field(self) -> None:
+        expected = json.loads(DOCUMENT)["codeSuggestions"]
+        for chunk_size in (1, 2, 7, len(DOCUMENT)):
+            self.assertEqual(expected, read(DOCUMENT, chunk_size, "codeSuggestions"))
+
+    def test_reads_a_top_level_array(self) -> None:
+        self.assertEqual([1, "two", [3]], read(b' [1, "two" , [3]] ', 3))
+        self.assertEqual([], read(b"[]", 1))
+
+    def test_returns_elements_as_soon_as_they_are_complete(self) -> None:
+        reader = ArrayItemReader()
+        self.assertEqual([b'{"a": 1}'], reader.feed(b'[{"a": 1}, {"b"'))
+        self.assertEqual([b'{"b": 2}'], reader.feed(b": 2}]"))
+        self.assertTrue(reader.finished)
+
+    def test_only_buffers_the_element_being_read(self) -> None:
+        reader = ArrayItemReader()
+        reader.feed(b"[" + b'"padding", ' * 1000 + b'{"partial"')
+        self.assertEqual(b'{"partial"', bytes(reader._buffer).strip())
+
+    def test_fails_when_the_array_is_missing_or_truncated(self) -> None:
+        with self.assertRaises(ValueError):
+            read(b'{"other": [1]}', 4, "codeSuggestions")
+        with self.assertRaises(ValueError):
+            read(b"[1, 2", 4)
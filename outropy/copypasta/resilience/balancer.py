@@ -0,0 +1,142 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+__all__ = ["Endpoint", "EndpointBalancer"]
+
+
+class Endpoint:
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.outstanding = 0
+        # Smoothed seconds per successful call, None until the first one
+        self.latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"Endpoint({self.url}, outstanding={self.outstanding}, "
+            f"latency={self.latency}, ejections={self.ejections})"
+        )
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.ok = True
+
+
+class EndpointBalancer:
+    """Spreads calls over endpoints by outstanding calls, weighted by latency.
+
+    Health checks are passive: an endpoint that fails `max_failures` calls in a row is
+    ejected for a cooldown that doubles with every ejection, then re-admitted. When
+    every endpoint is ejected, the one due back soonest is used anyway. Keys can be
+    pinned to the endpoint that owns them, e.g. a run to the host that created it.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        max_failures: int = 3,
+        base_cooldown: float = 5.0,
+        max_cooldown: float = 60.0,
+        smoothing: float = 0.3,
+        max_pins: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not urls:
+            raise ValueError("At least one endpoint is required")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.max_failures = max_failures
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.smoothing = smoothing
+        self.max_pins = max_pins
+        self.clock = clock
+        self._by_url: Dict[str, Endpoint] = {e.url: e for e in self.endpoints}
+        self._pins: OrderedDict[str, Endpoint] = OrderedDict()
+        # Where the scan starts, moved on every pick so ties take turns
+        self._start = 0
+
+    def choose(self, key: Optional[str] = None) -> Endpoint:
+        if key is not None and key in self._pins:
+            # Only the owner knows about the key, healthy or not
+            return self._pins[key]
+        if len(self.endpoints) == 1:
+            return self.endpoints[0]
+
+        now = self.clock()
+        self._start = (self._start + 1) % len(self.endpoints)
+        start = self._start
+        rotated = self.endpoints[start:] + self.endpoints[:start]
+        healthy = [e for e in rotated if e.ejected_until <= now]
+        if not healthy:
+            return min(self.endpoints, key=lambda e: e.ejected_until)
+        # Endpoints we know nothing about yet look as fast as the fastest one
+        known = [e.latency for e in healthy if e.latency is not None]
+        default_latency = min(known) if known else 1.0
+        return min(
+            healthy,
+            key=lambda e: (e.outstanding + 1)
+            * (e.latency if e.latency is not None else default_latency),
+        )
+
+    def pin(self, key: str, url: str) -> None:
+        endpoint = self._by_url.get(url)
+        if endpoint is None:
+            return
+        self._pins[key] = endpoint
+        self._pins.move_to_end(key)
+        while len(self._pins) > self.max_pins:
+            self._pins.popitem(last=False)
+
+    @contextmanager
+    def track(self, endpoint: Endpoint, timed: bool = True) -> Iterator[_Call]:
+        """Counts a call as outstanding while it runs, then records how it went.
+
+        The call fails if it raises, or if the caller sets `ok` to False. Untimed calls,
+        e.g. transfers that take as long as their payload is big, only count towards
+        the endpoint's health.
+        """
+        call = _Call()
+        started_at = self.clock()
+        load = 1 if timed else 0
+        endpoint.outstanding += load
+        try:
+            yield call
+        except asyncio.CancelledError:
+            # Not the endpoint's fault, and says nothing about its latency
+            endpoint.outstanding -= load
+            raise
+        except Exception:
+            endpoint.outstanding -= load
+            self._record(endpoint, False, None)
+            raise
+        endpoint.outstanding -= load
+        self._record(endpoint, call.ok, self.clock() - started_at if timed else None)
+
+    def _record(self, endpoint: Endpoint, ok: bool, seconds: Optional[float]) -> None:
+        if ok:
+            endpoint.consecutive_failures = 0
+            endpoint.ejections = 0
+            if seconds is not None:
+                endpoint.latency = (
+                    seconds
+                    if endpoint.latency is None
+                    else self.smoothing * seconds
+                    + (1 - self.smoothing) * endpoint.latency
+                )
+            return
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.max_failures:
+            cooldown = min(
+                self.base_cooldown * 2**endpoint.ejections, self.max_cooldown
+            )
+            endpoint.ejected_until = self.clock() + cooldown
+            endpoint.ejections += 1
+            # Once back, a single failure sends it away again, for twice as long
+            endpoint.consecutive_failures = self.max_failures - 1
@@ -0,0 +1,169 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Callable, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+__all__ = ["RateLimit", "LimiterStats", "TokenBucket", "Limiter", "RouteLimiter"]
+
+
+class RateLimit(BaseModel):
+    rate_per_second: Optional[float] = Field(
+        description="Sustained requests per second, None for no rate limit",
+        default=None,
+        gt=0,
+    )
+    burst: Optional[float] = Field(
+        description="How many requests can go out at once after being idle, defaults to one second worth of requests",
+        default=None,
+        ge=1,
+    )
+    max_in_flight: Optional[int] = Field(
+        description="How many requests can be in flight at the same time, None for no cap",
+        default=None,
+        gt=0,
+    )
+
+
+class LimiterStats:
+    def __init__(self) -> None:
+        self.acquired = 0
+        self.waiting = 0
+        self.in_flight = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.acquired += 1
+        self.queue_seconds_total += seconds
+        self.queue_seconds_max = max(self.queue_seconds_max, seconds)
+
+    @property
+    def queue_seconds_avg(self) -> float:
+        return self.queue_seconds_total / self.acquired if self.acquired else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "acquired": self.acquired,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "queue_seconds_total": self.queue_seconds_total,
+            "queue_seconds_avg": self.queue_seconds_avg,
+            "queue_seconds_max": self.queue_seconds_max,
+        }
+
+    def __repr__(self) -> str:
+        return f"LimiterStats({self.as_dict()})"
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate_per_second = rate_per_second
+        if burst is not None and burst < 1:
+            raise ValueError(f"Burst must be at least 1, got [{burst}]")
+        self.capacity = burst or max(rate_per_second, 1.0)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated_at = clock()
+        # Waiters queue up in FIFO order so nobody gets starved by newcomers
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second
+        )
+        self.updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        if tokens > self.capacity:
+            # Would never fit in the bucket, however long we waited
+            raise ValueError(
+                f"Can't acquire [{tokens}] tokens from a bucket of [{self.capacity}]"
+            )
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep((tokens - self.tokens) / self.rate_per_second)
+
+
+class Limiter:
+    """Token bucket rate limit plus a cap on concurrent calls (a bulkhead)."""
+
+    def __init__(self, limit: RateLimit) -> None:
+        self.limit = limit
+        self.stats = LimiterStats()
+        self._bucket = (
+            TokenBucket(limit.rate_per_second, limit.burst)
+            if limit.rate_per_second
+            else None
+        )
+        self._slots = (
+            asyncio.Semaphore(limit.max_in_flight) if limit.max_in_flight else None
+        )
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncGenerator[None, None]:
+        started_at = time.monotonic()
+        self.stats.waiting += 1
+        try:
+            if self._slots is not None:
+                await self._slots.acquire()
+            try:
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+            except BaseException:
+                if self._slots is not None:
+                    self._slots.release()
+                raise
+        finally:
+            self.stats.waiting -= 1
+
+        self.stats.record_wait(time.monotonic() - started_at)
+        self.stats.in_flight += 1
+        try:
+            yield None
+        finally:
+            self.stats.in_flight -= 1
+            if self._slots is not None:
+                self._slots.release()
+
+
+class RouteLimiter:
+    """Picks a `Limiter` by the longest matching route prefix, e.g. `/pipelines/*`."""
+
+    def __init__(self, limits: Optional[Dict[str, RateLimit]] = None) -> None:
+        self.limiters: Dict[str, Limiter] = {
+            route.rstrip("*"): Limiter(limit) for route, limit in (limits or {}).items()
+        }
+        # Longest prefixes first so the most specific route wins
+        self._routes = sorted(self.limiters.keys(), key=len, reverse=True)
+
+    def for_route(self, route: str) -> Optional[Limiter]:
+        return next(
+            (self.limiters[r] for r in self._routes if route.startswith(r)), None
+        )
+
+    @asynccontextmanager
+    async def acquire(self, route: str) -> AsyncGenerator[None, None]:
+        limiter = self.for_route(route)
+        if limiter is None:
+            yield None
+            return
+        async with limiter.acquire():
+            yield None
+
+    def stats(self) -> Dict[str, LimiterStats]:
+        return {route: limiter.stats for route, limiter in self.limiters.items()}
@@ -0,0 +1,169 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, Field
+
+__all__ = [
+    "Backoff",
+    "RetryPolicy",
+    "RetryBudget",
+    "RetryEngine",
+    "parse_retry_after",
+]
+
+T = TypeVar("T")
+
+
+class Backoff(BaseModel):
+    max_attempts: int = Field(
+        description="Total attempts, including the first one", default=4, ge=1
+    )
+    base_delay: float = Field(
+        description="Shortest wait between attempts, in seconds", default=0.2, gt=0
+    )
+    max_delay: float = Field(
+        description="Longest wait between attempts, in seconds", default=10.0, gt=0
+    )
+
+    def next_delay(self, previous_delay: Optional[float]) -> float:
+        # Decorrelated jitter, see
+        # https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+        upper = (previous_delay or self.base_delay) * 3
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+
+class RetryPolicy:
+    """Which failures are worth retrying, and how to back off for each of them.
+
+    Status codes are read from a `status_code` attribute on the raised exception, and
+    a `retry_after` attribute (in seconds) is honoured when the server asks us to wait,
+    as long as that is within the backoff's `max_delay`. Longer waits are given up on.
+    Errors in `unsent_exceptions` mean the request never reached the server, so they
+    are retried even for calls that are not idempotent.
+    """
+
+    def __init__(
+        self,
+        status_backoffs: Optional[Dict[int, Backoff]] = None,
+        exception_backoffs: Optional[Dict[Type[BaseException], Backoff]] = None,
+        unsent_exceptions: Tuple[Type[BaseException], ...] = (),
+    ) -> None:
+        self.status_backoffs = status_backoffs or {}
+        self.exception_backoffs = exception_backoffs or {}
+        self.unsent_exceptions = unsent_exceptions
+
+    def backoff_for(self, error: BaseException) -> Optional[Backoff]:
+        status_code = getattr(error, "status_code", None)
+        if status_code is not None:
+            return self.status_backoffs.get(status_code)
+        for exception_type, backoff in self.exception_backoffs.items():
+            if isinstance(error, exception_type):
+                return backoff
+        return None
+
+
+class RetryBudget:
+    """Caps retries to a fraction of all calls, so outages don't become retry storms.
+
+    Every call deposits `ratio` tokens and every retry withdraws one. The bucket starts
+    full so a quiet client can still retry a handful of times.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 10.0) -> None:
+        self.ratio = ratio
+        self.capacity = capacity
+        self.tokens = capacity
+
+    def deposit(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class RetryStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.budget_exhausted = 0
+
+
+class RetryEngine:
+    def __init__(
+        self,
+        policy: RetryPolicy,
+        budget: Optional[RetryBudget] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.policy = policy
+        self.budget = budget
+        self.sleep = sleep
+        self.stats = RetryStats()
+
+    async def run(self, fn: Callable[[], Awaitable[T]], idempotent: bool = True) -> T:
+        """Calls `fn` until it succeeds, fails for good or runs out of attempts.
+
+        Calls that are not idempotent are only retried when the failed attempt never
+        reached the server, as otherwise we can't know whether the server acted on it.
+        Once attempts run out, the last error is raised as is.
+        """
+        self.stats.calls += 1
+        if self.budget is not None:
+            self.budget.deposit()
+
+        attempt = 1
+        delay: Optional[float] = None
+        while True:
+            try:
+                return await fn()
+            except Exception as e:
+                retry = self._should_retry(e, attempt, idempotent)
+                if retry is None:
+                    raise
+                backoff, retry_after = retry
+                delay = max(backoff.next_delay(delay), retry_after)
+            self.stats.retries += 1
+            attempt += 1
+            await self.sleep(delay)
+
+    def _should_retry(
+        self, error: Exception, attempt: int, idempotent: bool
+    ) -> Optional[Tuple[Backoff, float]]:
+        if not idempotent and not isinstance(error, self.policy.unsent_exceptions):
+            return None
+        backoff = self.policy.backoff_for(error)
+        if backoff is None:
+            return None
+        retry_after = float(getattr(error, "retry_after", None) or 0.0)
+        # A server asking for a longer wait than we'd ever back off is not coming back
+        # soon, better to let the caller know than to stall
+        if attempt >= backoff.max_attempts or retry_after > backoff.max_delay:
+            self.stats.gave_up += 1
+            return None
+        if self.budget is not None and not self.budget.try_withdraw():
+            self.stats.budget_exhausted += 1
+            return None
+        return backoff, retry_after
+
+
+def parse_retry_after(
+    value: Optional[str], now: Callable[[], float] = time.time
+) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given as delta-seconds or a date."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now())
+    except (TypeError, ValueError):
+        return None
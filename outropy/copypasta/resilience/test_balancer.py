@@ -0,0 +1,76 @@
+import unittest
+
+from outropy.copypasta.resilience.balancer import EndpointBalancer
+
+
+class TestEndpointBalancer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 0.0
+        self.balancer = EndpointBalancer(
+            ["http://a/", "http://b/"],
+            max_failures=2,
+            base_cooldown=10,
+            clock=lambda: self.now,
+        )
+        self.a, self.b = self.balancer.endpoints
+
+    def fail_calls(self, times: int) -> None:
+        for _ in range(times):
+            with self.assertRaises(ConnectionError):
+                with self.balancer.track(self.a):
+                    raise ConnectionError()
+
+    def test_prefers_fewer_outstanding_calls(self) -> None:
+        busy = self.balancer.choose()
+        with self.balancer.track(busy):
+            for _ in range(3):
+                self.assertIsNot(busy, self.balancer.choose())
+        self.assertEqual(0, busy.outstanding)
+
+    def test_takes_turns_between_equals(self) -> None:
+        picks = {self.balancer.choose().url for _ in range(2)}
+        self.assertEqual({"http://a/", "http://b/"}, picks)
+
+    def test_prefers_lower_latency(self) -> None:
+        with self.balancer.track(self.a):
+            self.now += 2
+        with self.balancer.track(self.b):
+            self.now += 0.5
+        self.assertIs(self.b, self.balancer.choose())
+        # Twice the calls in flight still beats four times the latency
+        self.b.outstanding = 1
+        self.assertIs(self.b, self.balancer.choose())
+
+    def test_untimed_calls_only_count_towards_health(self) -> None:
+        with self.balancer.track(self.a, timed=False):
+            self.assertEqual(0, self.a.outstanding)
+            self.now += 60
+        self.assertIsNone(self.a.latency)
+
+        for _ in range(2):
+            with self.balancer.track(self.a, timed=False) as call:
+                call.ok = False
+        self.assertEqual(1, self.a.ejections)
+
+    def test_ejects_and_readmits_failing_endpoints(self) -> None:
+        self.fail_calls(2)
+        self.assertEqual(1, self.a.ejections)
+        self.assertIs(self.b, self.balancer.choose())
+        self.b.outstanding = 100
+        self.assertIs(self.b, self.balancer.choose())
+
+        self.now += 10
+        self.assertIs(self.a, self.balancer.choose())
+        self.fail_calls(1)
+        self.assertEqual(30, self.a.ejected_until)
+
+        self.now += 20
+        with self.balancer.track(self.a) as call:
+            call.ok = True
+        self.assertEqual(0, self.a.ejections)
+
+    def test_pinned_keys_stick_to_their_endpoint(self) -> None:
+        self.balancer.pin("urn:run", "http://b/")
+        self.b.outstanding = 100
+        self.assertIs(self.b, self.balancer.choose("urn:run"))
+        self.assertIs(self.a, self.balancer.choose("urn:other"))
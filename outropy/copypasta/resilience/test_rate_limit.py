@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+
+from outropy.copypasta.resilience.rate_limit import (
+    RateLimit,
+    RouteLimiter,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_allows_bursts_then_refills_at_rate(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(rate_per_second=2, burst=3, clock=clock)
+
+        self.assertEqual(
+            [True, True, True, False], [bucket.try_acquire() for _ in range(4)]
+        )
+        clock.now = 0.5
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        clock.now = 100
+        self.assertEqual(3, sum(bucket.try_acquire() for _ in range(10)))
+
+    def test_rejects_bursts_that_never_fit_a_request(self) -> None:
+        with self.assertRaises(ValueError):
+            TokenBucket(rate_per_second=10, burst=0.5)
+        with self.assertRaises(ValueError):
+            RateLimit(rate_per_second=10, burst=0.5)
+        with self.assertRaises(ValueError):
+            asyncio.run(TokenBucket(rate_per_second=10, burst=2).acquire(3))
+
+
+class TestRouteLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_caps_requests_in_flight(self) -> None:
+        limiter = RouteLimiter({"/pipelines/*": RateLimit(max_in_flight=2)})
+        peak = 0
+
+        async def call() -> None:
+            nonlocal peak
+            async with limiter.acquire("/pipelines/runs/1"):
+                peak = max(peak, limiter.stats()["/pipelines/"].in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[call() for _ in range(6)])
+
+        stats = limiter.stats()["/pipelines/"]
+        self.assertEqual(2, peak)
+        self.assertEqual(6, stats.acquired)
+        self.assertEqual(0, stats.in_flight)
+        self.assertEqual(0, stats.waiting)
+        self.assertGreater(stats.queue_seconds_max, 0.015)
+
+    async def test_rate_limits_and_counts_queueing(self) -> None:
+        limiter = RouteLimiter({"/data/": RateLimit(rate_per_second=100, burst=1)})
+        started = asyncio.get_running_loop().time()
+
+        for _ in range(4):
+            async with limiter.acquire("/data/urn:1"):
+                pass
+
+        self.assertGreaterEqual(asyncio.get_running_loop().time() - started, 0.025)
+        self.assertGreater(limiter.stats()["/data/"].queue_seconds_total, 0.025)
+
+    async def test_most_specific_route_wins_and_others_pass_through(self) -> None:
+        limiter = RouteLimiter(
+            {
+                "/pipelines/*": RateLimit(max_in_flight=10),
+                "/pipelines/runs/*": RateLimit(max_in_flight=1),
+            }
+        )
+        self.assertIs(
+            limiter.limiters["/pipelines/runs/"],
+            limiter.for_route("/pipelines/runs/1"),
+        )
+        self.assertIs(
+            limiter.limiters["/pipelines/"], limiter.for_route("/pipelines/execute")
+        )
+        self.assertIsNone(limiter.for_route("/benchmarks/create"))
+        async with limiter.acquire("/benchmarks/create"):
+            pass
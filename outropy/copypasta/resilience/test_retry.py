@@ -0,0 +1,106 @@
+import unittest
+from typing import List
+
+from outropy.copypasta.resilience.retry import (
+    Backoff,
+    RetryBudget,
+    RetryEngine,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int, retry_after: float = 0.0) -> None:
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class Flaky:
+    def __init__(self, *errors: Exception) -> None:
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+class TestRetryEngine(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.sleeps: List[float] = []
+        self.policy = RetryPolicy(
+            status_backoffs={503: Backoff(max_attempts=3, base_delay=1, max_delay=5)},
+            exception_backoffs={ConnectionError: Backoff(max_attempts=3)},
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+
+    def engine(self, budget: RetryBudget | None = None) -> RetryEngine:
+        return RetryEngine(self.policy, budget, sleep=self.sleep)
+
+    async def test_retries_listed_statuses_and_exceptions(self) -> None:
+        fn = Flaky(StatusError(503), ConnectionError())
+        self.assertEqual("ok", await self.engine().run(fn))
+        self.assertEqual(3, fn.calls)
+
+    async def test_gives_up_after_max_attempts_with_the_last_error(self) -> None:
+        fn = Flaky(StatusError(503), StatusError(503), StatusError(503))
+        engine = self.engine()
+        with self.assertRaises(StatusError):
+            await engine.run(fn)
+        self.assertEqual(3, fn.calls)
+        self.assertEqual(1, engine.stats.gave_up)
+
+    async def test_does_not_retry_unlisted_failures_or_non_idempotent_calls(
+        self,
+    ) -> None:
+        fn = Flaky(StatusError(400))
+        with self.assertRaises(StatusError):
+            await self.engine().run(fn)
+        fn = Flaky(StatusError(503))
+        with self.assertRaises(StatusError):
+            await self.engine().run(fn, idempotent=False)
+        self.assertEqual(1, fn.calls)
+
+    async def test_retries_non_idempotent_calls_that_were_never_sent(self) -> None:
+        self.policy.unsent_exceptions = (ConnectionRefusedError,)
+        fn = Flaky(ConnectionRefusedError())
+        self.assertEqual("ok", await self.engine().run(fn, idempotent=False))
+        self.assertEqual(2, fn.calls)
+
+    async def test_delays_use_decorrelated_jitter_and_retry_after(self) -> None:
+        await self.engine().run(Flaky(StatusError(503), StatusError(503, 4.5)))
+        self.assertTrue(1 <= self.sleeps[0] <= 3)
+        self.assertTrue(4.5 <= self.sleeps[1] <= 5)
+
+    async def test_gives_up_when_asked_to_wait_too_long(self) -> None:
+        engine = self.engine()
+        with self.assertRaises(StatusError):
+            await engine.run(Flaky(StatusError(503, 3600)))
+        self.assertEqual([], self.sleeps)
+        self.assertEqual(1, engine.stats.gave_up)
+
+    async def test_budget_stops_retry_storms(self) -> None:
+        engine = self.engine(RetryBudget(ratio=0.1, capacity=2))
+        for _ in range(2):
+            await engine.run(Flaky(StatusError(503)))
+        with self.assertRaises(StatusError):
+            await engine.run(Flaky(StatusError(503)))
+        self.assertEqual(1, engine.stats.budget_exhausted)
+
+
+class TestParseRetryAfter(unittest.TestCase):
+    def test_parses_seconds_and_dates(self) -> None:
+        self.assertEqual(3.0, parse_retry_after("3"))
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(
+            10.0,
+            parse_retry_after(
+                "Wed, 21 Oct 2015 07:28:10 GMT", now=lambda: 1445412480.0
+            ),
+        )
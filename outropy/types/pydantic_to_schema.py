@@ -1,8 +1,12 @@
-from typing import Any, List, Type, TypeVar
+import hashlib
+import json
+from typing import Any, Dict, List, Type, TypeVar
+from weakref import WeakKeyDictionary
 
 from pydantic import BaseModel
+from pydantic.json_schema import JsonSchemaMode
 
-from outropy.copypasta.json.json import JSON_VAL
+from outropy.copypasta.json.json import JSON_OBJECT, JSON_VAL
 
 
 def recursive_convert_pydantic_to_dict(data: Any) -> Any:
@@ -22,10 +26,48 @@ def recursive_convert_pydantic_to_dict(data: Any) -> Any:
 T = TypeVar("T", bound=BaseModel)
 
 
-def to_schema(data: Type[T] | List[Type[T]]) -> JSON_VAL:
+def canonical_schema(schema: JSON_OBJECT) -> bytes:
+    # Key order doesn't change what a schema means, so it doesn't change this either
+    return json.dumps(
+        schema, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode()
+
+
+def schema_digest(schema: JSON_OBJECT) -> str:
+    return hashlib.sha256(canonical_schema(schema)).hexdigest()
+
+
+class CachedSchema:
+    """A model's JSON schema, along with a canonical serialization and its hash.
+
+    Shared by everyone asking for the same model and mode, so treat it as read-only.
+    """
+
+    def __init__(self, schema: JSON_OBJECT) -> None:
+        self.schema = schema
+        self.canonical = canonical_schema(schema)
+        self.digest = hashlib.sha256(self.canonical).hexdigest()
+
+
+# Weakly keyed so models defined on the fly don't stay alive forever
+_schema_cache: "WeakKeyDictionary[type, Dict[str, CachedSchema]]" = WeakKeyDictionary()
+
+
+def cached_schema(
+    model: Type[BaseModel], mode: JsonSchemaMode = "validation"
+) -> CachedSchema:
+    by_mode = _schema_cache.setdefault(model, {})
+    if mode not in by_mode:
+        by_mode[mode] = CachedSchema(model.model_json_schema(mode=mode))
+    return by_mode[mode]
+
+
+def to_schema(
+    data: Type[T] | List[Type[T]], mode: JsonSchemaMode = "validation"
+) -> JSON_VAL:
     if isinstance(data, list):
         items = []
         for d in data:
-            items.append(d.model_json_schema())
+            items.append(cached_schema(d, mode).schema)
         return items
-    return data.model_json_schema()
+    return cached_schema(data, mode).schema
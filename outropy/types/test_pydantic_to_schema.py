@@ -1,9 +1,16 @@
+import gc
+import json
 import unittest
 from typing import Any, Dict, List
 
 from pydantic import BaseModel, Field
 
-from outropy.types.pydantic_to_schema import recursive_convert_pydantic_to_dict
+from outropy.types.pydantic_to_schema import (
+    _schema_cache,
+    cached_schema,
+    recursive_convert_pydantic_to_dict,
+    to_schema,
+)
 
 
 class ChildModel(BaseModel):
@@ -65,3 +72,31 @@ class TestRecursiveConvertPydanticToDict(unittest.TestCase):
                 ],
             },
         )
+
+
+class TestToSchema(unittest.TestCase):
+    def test_generates_each_schema_once(self) -> None:
+        self.assertIs(to_schema(ParentModel), to_schema(ParentModel))
+        self.assertEqual(ParentModel.model_json_schema(), to_schema(ParentModel))
+        self.assertEqual(
+            [ChildModel.model_json_schema()] * 2, to_schema([ChildModel, ChildModel])
+        )
+
+    def test_keeps_a_schema_per_mode(self) -> None:
+        validation = cached_schema(ParentModel)
+        serialization = cached_schema(ParentModel, "serialization")
+        self.assertIsNot(validation, serialization)
+        self.assertEqual(
+            json.loads(validation.canonical), ParentModel.model_json_schema()
+        )
+
+    def test_does_not_keep_models_alive(self) -> None:
+        class Temporary(BaseModel):
+            name: str
+
+        digest = cached_schema(Temporary).digest
+        self.assertEqual(64, len(digest))
+
+        del Temporary
+        gc.collect()
+        self.assertNotIn("Temporary", [m.__name__ for m in list(_schema_cache.keys())])